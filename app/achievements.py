@@ -1,8 +1,14 @@
 """
 Handles checking and awarding achievements.
 """
+import logging
+from sqlalchemy import select, func, case, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from app.database import db, User, Achievement, UserAchievement, GameResult, Kviz
 
+logger = logging.getLogger(__name__)
+
 # A list of all achievements in the system.
 # We will populate them in the DB when the app starts.
 ALL_ACHIEVEMENTS = [
@@ -26,72 +32,91 @@ ALL_ACHIEVEMENTS = [
     }
 ]
 
+ALL_ACHIEVEMENT_IDS = frozenset(a["id"] for a in ALL_ACHIEVEMENTS)
+
 def check_and_award_achievements(user_id: int, new_result: GameResult):
     """
     Checks all achievement conditions for a user after they finish a quiz.
-    Runs in a separate try/except block so it never crashes the game.
+    Runs inside a SAVEPOINT in a separate try/except block so it never
+    crashes the game. Does not commit: new achievements are saved by the
+    caller's commit together with the game result.
     """
     try:
-        # Get all achievements the user *already* has
-        existing_ach_ids = {
-            ua.achievement_id_fk for ua in
-            UserAchievement.query.filter_by(user_id_fk=user_id).all()
-        }
+        with db.session.begin_nested():
+            # Get all achievements the user *already* has
+            existing_ach_ids = set(db.session.execute(
+                select(UserAchievement.achievement_id_fk).where(UserAchievement.user_id_fk == user_id)
+            ).scalars())
+
+            # Achievements the user can still earn; nothing to check if none are left
+            remaining = ALL_ACHIEVEMENT_IDS - existing_ach_ids
+            if not remaining:
+                return
 
-        newly_awarded = []
+            newly_awarded = []
 
-        # --- 1. Check "Professor" ---
-        if "professor" not in existing_ach_ids:
-            if new_result.score == new_result.total_questions:
-                newly_awarded.append(UserAchievement(
-                    user_id_fk=user_id, achievement_id_fk="professor"
-                ))
-                existing_ach_ids.add("professor") # Add for next check
+            # --- 1. Check "Professor" ---
+            if "professor" in remaining:
+                if new_result.score == new_result.total_questions:
+                    newly_awarded.append(UserAchievement(
+                        user_id_fk=user_id, achievement_id_fk="professor"
+                    ))
 
-        # --- 2. Get all user results for aggregate checks ---
-        all_results = GameResult.query.filter_by(user_id_fk=user_id).all()
+            # --- 2. Count all user results (and scheduled ones) in a single query ---
+            # Only needed while the count-based achievements are still pending
+            if "veteran" in remaining or "warrior" in remaining:
+                total_results, scheduled_results = db.session.execute(
+                    select(
+                        func.count(GameResult.id),
+                        func.coalesce(func.sum(case((Kviz.quiz_mode == "scheduled", 1), else_=0)), 0)
+                    ).select_from(GameResult)
+                     .join(Kviz, Kviz.kviz_id == GameResult.kviz_id_fk)
+                     .where(GameResult.user_id_fk == user_id)
+                ).one()
 
-        # --- 3. Check "Veteran" ---
-        if "veteran" not in existing_ach_ids:
-            if len(all_results) >= 10:
-                newly_awarded.append(UserAchievement(
-                    user_id_fk=user_id, achievement_id_fk="veteran"
-                ))
-                existing_ach_ids.add("veteran")
+                # --- 3. Check "Veteran" ---
+                if "veteran" in remaining and total_results >= 10:
+                    newly_awarded.append(UserAchievement(
+                        user_id_fk=user_id, achievement_id_fk="veteran"
+                    ))
 
-        # --- 4. Check "Warrior" ---
-        if "warrior" not in existing_ach_ids:
-            # We need the full quiz objects for this check
-            scheduled_quiz_ids = {
-                k.kviz_id for k in db.session.query(Kviz.kviz_id).filter_by(quiz_mode="scheduled").all()
-            }
-            completed_scheduled_count = sum(
-                1 for res in all_results if res.kviz_id_fk in scheduled_quiz_ids
-            )
-            if completed_scheduled_count >= 3:
-                newly_awarded.append(UserAchievement(
-                    user_id_fk=user_id, achievement_id_fk="warrior"
-                ))
-                existing_ach_ids.add("warrior")
+                # --- 4. Check "Warrior" ---
+                if "warrior" in remaining and scheduled_results >= 3:
+                    newly_awarded.append(UserAchievement(
+                        user_id_fk=user_id, achievement_id_fk="warrior"
+                    ))
+
+            # --- Add new achievements (committed by the caller) ---
+            if newly_awarded:
+                db.session.add_all(newly_awarded)
 
-        # --- Commit new achievements ---
         if newly_awarded:
-            db.session.add_all(newly_awarded)
-            db.session.commit()
-            print(f"Awarded {len(newly_awarded)} new achievements to user {user_id}")
+            logger.info("Awarded %d new achievements to user %s", len(newly_awarded), user_id)
 
-    except Exception as e:
-        # Log the error but don't crash the request
-        print(f"CRITICAL: Error during achievement check for user {user_id}: {e}")
-        db.session.rollback()
+    except Exception:
+        # Log the error but don't crash the request; the savepoint was
+        # rolled back, so the caller's pending game result is untouched
+        logger.exception("Error during achievement check for user %s", user_id)
 
 def init_achievements():
     """
-    Populates the Achievement table if it's empty.
-    Called on app startup.
+    Populates the Achievement table with any missing achievements.
+    Called on app startup. Safe to run repeatedly: a single
+    INSERT ... ON CONFLICT DO NOTHING statement is emitted.
     """
-    if Achievement.query.count() == 0:
-        print("Populating achievements table...")
-        for ach_data in ALL_ACHIEVEMENTS:
-            db.session.add(Achievement(**ach_data))
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "sqlite":
+        stmt = sqlite_insert(Achievement).on_conflict_do_nothing(index_elements=["id"])
+    elif dialect == "postgresql":
+        stmt = pg_insert(Achievement).on_conflict_do_nothing(index_elements=["id"])
+    else:
+        # Generic fallback: only insert the achievements that are missing
+        existing_ids = set(db.session.execute(select(Achievement.id)).scalars())
+        missing = [a for a in ALL_ACHIEVEMENTS if a["id"] not in existing_ids]
+        if missing:
+            db.session.execute(insert(Achievement), missing)
         db.session.commit()
+        return
+
+    db.session.execute(stmt, ALL_ACHIEVEMENTS)
+    db.session.commit()
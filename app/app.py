@@ -6,27 +6,74 @@ import os
 from typing import Any
 
 from dotenv import load_dotenv
-from flask import Flask, Response
+from flask import Flask, Response, request
+from flask.json.provider import DefaultJSONProvider
 from werkzeug.middleware.proxy_fix import ProxyFix
+from werkzeug.middleware.shared_data import SharedDataMiddleware
+
+try:
+    import orjson
+except ImportError:  # Volitelná závislost; bez ní se použije standardní json
+    orjson = None
 
 from .database import init_app as init_database
 from .blueprints import register_blueprints
 from .blueprints.auth import init_oauth
 
+# Absolute paths for frontend directories, resolved once at import time
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(APP_DIR)
+FRONTEND_DIR = os.path.join(PROJECT_ROOT, 'frontend')
+FRONTEND_STATIC_DIR = os.path.join(FRONTEND_DIR, 'static')
+
+# PWA files served from the site root directly by Werkzeug (no Flask routing),
+# with their browser cache lifetime in seconds. The service worker is always
+# revalidated so updates are picked up immediately.
+PWA_FILES = {
+    '/sw.js': 0,
+    '/manifest.json': 3600,
+}
+
+# Endpoints serving session-independent content, exempt from the no-store headers
+# (they set their own cache headers)
+CACHEABLE_ENDPOINTS = frozenset({'static', 'game_api.get_quiz_list'})
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider using orjson, keeping the output of Flask's default provider."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        # Data převede self.default jako Flask; klíče typu int apod. převede na řetězce jako json
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=self.default, option=option).decode()
+        except orjson.JSONEncodeError:
+            # Co orjson neumí (např. celá čísla nad 64 bitů), zpracuje standardní provider
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
 
 def create_app(config: dict[str, Any] | None = None) -> Flask:
     """Create and configure the Flask application instance."""
     load_dotenv()
-    
-    # Calculate absolute paths for frontend directories
-    app_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.dirname(app_dir)
-    frontend_dir = os.path.join(project_root, 'frontend')
-    frontend_static_dir = os.path.join(frontend_dir, 'static')
 
     app = Flask(__name__, instance_relative_config=False, 
-                template_folder=frontend_dir, 
-                static_folder=frontend_static_dir)
+                template_folder=FRONTEND_DIR, 
+                static_folder=FRONTEND_STATIC_DIR)
+
+    # Serve PWA files before the request reaches Flask
+    for url_path, max_age in PWA_FILES.items():
+        app.wsgi_app = SharedDataMiddleware(
+            app.wsgi_app,
+            {url_path: os.path.join(FRONTEND_DIR, url_path.lstrip('/'))},
+            cache_timeout=max_age
+        )
 
     # Apply ProxyFix to trust headers from the reverse proxy
     # This ensures url_for(..., _external=True) generates the correct
@@ -44,12 +91,32 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
         "DATABASE_URL", "sqlite:///kvizarena.db"
     )
 
+    # Přihlašovací údaje lokálního testovacího uživatele (načteno jednou při startu)
+    app.config["LOCAL_TEST_USERNAME"] = os.getenv("LOCAL_TEST_USERNAME")
+    app.config["LOCAL_TEST_PASSWORD"] = os.getenv("LOCAL_TEST_PASSWORD")
+
+    # Maximální velikost požadavku (CSV importy); větší požadavky skončí chybou 413
+    app.config["MAX_CONTENT_LENGTH"] = 50 * 1024 * 1024
+
     # Natvrdo vypne modifikace
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
     if config:
         app.config.update(config)
 
+    # Pool spojení pro serverové databáze (PostgreSQL), kde každý požadavek čeká hlavně
+    # na databázi; SQLite si pool řídí Flask-SQLAlchemy sám
+    if not app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite"):
+        app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", {
+            "pool_size": int(os.getenv("DB_POOL_SIZE", "20")),
+            "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "40")),
+            "pool_pre_ping": True,
+        })
+
+    # Rychlejší (de)serializace JSON API, pokud je orjson nainstalovaný
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+
     init_database(app)
     init_oauth(app)
     register_blueprints(app)
@@ -59,7 +126,12 @@ def create_app(config: dict[str, Any] | None = None) -> Flask:
         """
         Ensure responses aren't cached by proxies or browsers.
         This is critical for preventing session hijacking.
+        Static files and the quiz list carry no session state and keep
+        their own cache headers (ETag revalidation).
         """
+        if request.endpoint in CACHEABLE_ENDPOINTS:
+            return response
+
         response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, post-check=0, pre-check=0, max-age=0'
         response.headers['Pragma'] = 'no-cache'
         response.headers['Expires'] = '-1'
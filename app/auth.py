@@ -3,7 +3,8 @@ OAuth-based authentication decorator for admin routes.
 """
 from functools import wraps
 from flask import session, redirect, url_for
-from app.database import User
+from sqlalchemy import select
+from app.database import db, User
 
 def admin_required(f):
     @wraps(f)
@@ -14,10 +15,13 @@ def admin_required(f):
             # Not logged in, redirect to Google login
             return redirect(url_for('auth.login_google'))
 
-        user = User.query.get(user_id)
+        # Only the admin flag is needed, so don't load the whole User row
+        is_admin = db.session.execute(
+            select(User.is_admin).where(User.id == user_id)
+        ).scalar()
 
-        if not user or not user.is_admin:
-            # Logged in, but not an admin
+        if not is_admin:
+            # Logged in, but not an admin (or the user no longer exists)
             return redirect(url_for('main.index')) # Redirect to homepage
 
         return f(*args, **kwargs)
@@ -6,19 +6,13 @@ for the main Flask application.
 """
 
 from __future__ import annotations
-import os
-from pathlib import Path
-
-from flask import Blueprint, Flask, jsonify, redirect, url_for, render_template, send_from_directory, session
+from flask import Blueprint, Flask, jsonify, redirect, url_for, render_template, session
 
 # Import new blueprints here
 from .admin import admin_bp
 from .game_api import game_api_bp
 from .auth import auth_bp
 
-# Calculate the frontend directory path once
-FRONTEND_DIR = Path(__file__).parent.parent.parent / 'frontend'
-
 
 def register_blueprints(app: Flask) -> None:
     """Register all application blueprints."""
@@ -38,17 +32,7 @@ def register_blueprints(app: Flask) -> None:
     # New Auth blueprint
     app.register_blueprint(auth_bp)
 
-    # --- PWA FILE ROUTES ---
-
-    @app.route('/sw.js')
-    def serve_sw():
-        """Serves the service worker file from the frontend directory."""
-        return send_from_directory(str(FRONTEND_DIR), 'sw.js')
-
-    @app.route('/manifest.json')
-    def serve_manifest():
-        """Serves the manifest file from the frontend directory."""
-        return send_from_directory(str(FRONTEND_DIR), 'manifest.json')
+    # PWA files (/sw.js, /manifest.json) are served by SharedDataMiddleware in app.py
 
 
 def create_health_blueprint() -> Blueprint:
@@ -7,6 +7,7 @@ for importing quizzes from CSV (exported from Vševěd).
 import csv
 import io
 import logging
+import math
 from datetime import datetime
 from flask import (
     Blueprint, render_template, request,
@@ -14,8 +15,89 @@ from flask import (
 )
 from werkzeug.utils import secure_filename
 from app.database import db, Otazka, Kviz, KvizOtazky, User, GameResult
-from sqlalchemy import func as sqlalchemy_func
+from sqlalchemy import func as sqlalchemy_func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
 from app.auth import admin_required
+from app.blueprints.game_api import count_answers, invalidate_quiz_list
+
+logger = logging.getLogger(__name__)
+
+# Columns every imported CSV must contain (and fill in for each row)
+REQUIRED_CSV_COLUMNS = frozenset({
+    'otazka', 'spravna_odpoved', 'spatna_odpoved1', 'spatna_odpoved2', 'spatna_odpoved3'
+})
+
+# Text columns copied from each CSV row: (column, default when the column is absent)
+CSV_TEXT_FIELDS = (
+    ('spravna_odpoved', ''),
+    ('spatna_odpoved1', ''),
+    ('spatna_odpoved2', ''),
+    ('spatna_odpoved3', ''),
+    ('tema', 'Imported'),
+    ('zdroj_url', ''),
+)
+
+# Number of rows sent to the database per bulk INSERT during CSV import
+IMPORT_BATCH_SIZE = 1000
+
+# Number of quizzes listed per page in the admin overview
+QUIZZES_PER_PAGE = 50
+
+_strip = str.strip
+
+
+def _safe_int(value, default: int) -> int:
+    """Parses an integer CSV cell, falling back to default for empty or invalid values."""
+    if value is None:
+        return default
+    text = _strip(str(value))
+    # Checked up front instead of catching ValueError for every bad row: at most one
+    # sign, then only decimal digits (isdecimal(), unlike isdigit(), only passes digits
+    # int() can parse). Digit separators like '1_000' fall back to the default too.
+    digits = text[1:] if text[:1] in ('+', '-') else text
+    if digits.isdecimal():
+        return int(text)
+    return default
+
+
+def _row_to_question(row: dict, otazka_text: str, _fields=CSV_TEXT_FIELDS) -> dict:
+    """Converts a validated CSV row into the column values of a new question."""
+    question = {name: _strip(row.get(name, default) or '') for name, default in _fields}
+    question['otazka'] = otazka_text
+    question['obtiznost'] = _safe_int(row.get('obtiznost'), 3)
+    return question
+
+
+def _import_question_batch(kviz_id: int, questions: list, first_position: int):
+    """
+    Links a batch of parsed CSV questions to a quiz, creating those that
+    don't exist yet. Positions are numbered from first_position in batch order.
+    """
+    # 1. Find which questions already exist in the DB
+    question_ids = dict(db.session.execute(
+        select(Otazka.otazka, Otazka.id)
+        .where(Otazka.otazka.in_([q['otazka'] for q in questions]))
+    ).all())
+
+    # 2. Bulk-insert the new questions, collecting their IDs
+    new_question_rows = [q for q in questions if q['otazka'] not in question_ids]
+    if new_question_rows:
+        inserted = db.session.execute(
+            insert(Otazka).returning(Otazka.id, Otazka.otazka), new_question_rows
+        )
+        question_ids.update({text: q_id for q_id, text in inserted})
+
+    # 3. Link the questions to the quiz with correct ordering
+    db.session.execute(insert(KvizOtazky), [
+        {
+            "kviz_id_fk": kviz_id,
+            "otazka_id_fk": question_ids[q['otazka']],
+            "poradi": first_position + index
+        }
+        for index, q in enumerate(questions)
+    ])
+
 
 # Create the Blueprint
 admin_bp = Blueprint(
@@ -38,17 +120,29 @@ def kvizy_route():
     (Adapted from Vševěd and converted to SQLAlchemy)
     """
     # GET request only - quiz creation removed
-    all_quizzes = Kviz.query.order_by(Kviz.nazev).all()
-    # To display question counts, we fetch them efficiently
-    quizzes_with_counts = []
-    for quiz in all_quizzes:
-        count = db.session.query(KvizOtazky).filter_by(kviz_id_fk=quiz.kviz_id).count()
-        quizzes_with_counts.append({
-            "kviz": quiz,
-            "pocet_otazek": count
-        })
-
-    return render_template('kvizy.html', quizzes_with_counts=quizzes_with_counts)
+    total_quizzes = db.session.execute(select(sqlalchemy_func.count(Kviz.kviz_id))).scalar()
+    pages = max(math.ceil(total_quizzes / QUIZZES_PER_PAGE), 1)
+    # Out-of-range pages show the nearest existing one instead of an empty list
+    page = min(max(request.args.get('page', 1, type=int), 1), pages)
+
+    # Fetch one page of quizzes together with their question counts in a single query
+    # (outer join so quizzes without questions are listed with 0)
+    rows = db.session.execute(
+        select(Kviz, sqlalchemy_func.count(KvizOtazky.id))
+        .outerjoin(KvizOtazky, KvizOtazky.kviz_id_fk == Kviz.kviz_id)
+        .group_by(Kviz.kviz_id)
+        .order_by(Kviz.nazev)
+        .limit(QUIZZES_PER_PAGE)
+        .offset((page - 1) * QUIZZES_PER_PAGE)
+    ).all()
+
+    quizzes_with_counts = [
+        {"kviz": quiz, "pocet_otazek": count}
+        for quiz, count in rows
+    ]
+
+    return render_template('kvizy.html', quizzes_with_counts=quizzes_with_counts,
+                           page=page, pages=pages)
 
 @admin_bp.route('/kviz/delete/<int:kviz_id>', methods=['POST'])
 def delete_quiz_route(kviz_id: int):
@@ -56,10 +150,11 @@ def delete_quiz_route(kviz_id: int):
     Deletes a quiz. (Adapted from Vševěd)
     Thanks to 'cascade' in the model, this also deletes entries in KvizOtazky.
     """
-    quiz_to_delete = Kviz.query.get_or_404(kviz_id)
+    quiz_to_delete = db.get_or_404(Kviz, kviz_id)
     try:
         db.session.delete(quiz_to_delete)
         db.session.commit()
+        invalidate_quiz_list()
         flash(f"Quiz '{quiz_to_delete.nazev}' was successfully deleted.", "success")
     except Exception as e:
         db.session.rollback()
@@ -94,11 +189,6 @@ def import_quiz_csv():
         flash("Quiz name and CSV file are required.", "error")
         return redirect(url_for('admin.kvizy_route'))
 
-    # Check if quiz name already exists
-    if Kviz.query.filter_by(nazev=quiz_name).first():
-        flash(f"A quiz with the name '{quiz_name}' already exists. Choose another name.", "error")
-        return redirect(url_for('admin.kvizy_route'))
-
     if not file.filename.lower().endswith('.csv'):
         flash("Unsupported file type. Please upload a .csv file.", "error")
         return redirect(url_for('admin.kvizy_route'))
@@ -117,93 +207,104 @@ def import_quiz_csv():
             allow_retakes=allow_retakes
         )
         db.session.add(new_quiz)
-        db.session.commit()  # Commit to get the new_quiz.kviz_id
+        try:
+            db.session.flush()  # Flush to get the new_quiz.kviz_id (committed at the end)
+        except IntegrityError:
+            # Quiz names are unique in the DB, so a duplicate fails here (no race window)
+            db.session.rollback()
+            flash(f"A quiz with the name '{quiz_name}' already exists. Choose another name.", "error")
+            return redirect(url_for('admin.kvizy_route'))
 
         # 2. Process the CSV
+        # Decode the upload lazily while reading rows instead of loading it whole.
         # Use UTF-8-SIG to handle potential BOM from Excel
-        stream = io.StringIO(file.stream.read().decode("UTF-8-SIG"), newline=None)
+        stream = io.TextIOWrapper(file.stream, encoding="UTF-8-SIG", newline="")
         csv_reader = csv.DictReader(stream)
-        
-        required_columns = ['otazka', 'spravna_odpoved', 'spatna_odpoved1', 'spatna_odpoved2', 'spatna_odpoved3']
-        
-        questions_to_link = []
-        question_ids_in_this_quiz = set()
+
+        # Normalize header names (stray whitespace or a repeated BOM from Excel)
+        csv_reader.fieldnames = [
+            name.strip().lstrip("\ufeff") for name in csv_reader.fieldnames or []
+        ]
+
+        # Validate the header once; rows then only need their values checked
+        missing_columns = REQUIRED_CSV_COLUMNS - set(csv_reader.fieldnames)
+        if missing_columns:
+            db.session.rollback()
+            flash(f"CSV is missing required columns: {', '.join(sorted(missing_columns))}", "error")
+            return redirect(url_for('admin.kvizy_route'))
+
+        # Rows are stored in batches while reading, so memory stays bounded
+        seen_questions = set()
+        batch = []
+        linked_count = 0
 
         for row in csv_reader:
-            if not all(col in row and row[col] for col in required_columns):
-                logging.warning(f"Skipping CSV row due to missing data: {row}")
+            if not all(row[col] for col in REQUIRED_CSV_COLUMNS):
+                logger.warning("Skipping CSV row due to missing data: %s", row)
                 continue
 
-            # 3. Find the question in the DB or create it
             otazka_text = row['otazka'].strip()
-            existing_question = Otazka.query.filter_by(otazka=otazka_text).first()
-            
-            if existing_question:
-                question_id = existing_question.id
-            else:
-                # Question doesn't exist, create it
-                new_question = Otazka(
-                    otazka=otazka_text,
-                    spravna_odpoved=row['spravna_odpoved'].strip(),
-                    spatna_odpoved1=row['spatna_odpoved1'].strip(),
-                    spatna_odpoved2=row['spatna_odpoved2'].strip(),
-                    spatna_odpoved3=row['spatna_odpoved3'].strip(),
-                    tema=row.get('tema', 'Imported').strip(),
-                    obtiznost=int(row.get('obtiznost', 3)),
-                    zdroj_url=row.get('zdroj_url', '').strip()
-                )
-                db.session.add(new_question)
-                db.session.commit() # Commit to get the ID
-                question_id = new_question.id
-            
+
             # Check if we have already added this question to this specific quiz
-            if question_id not in question_ids_in_this_quiz:
-                questions_to_link.append(question_id)
-                question_ids_in_this_quiz.add(question_id)
-            else:
+            if otazka_text in seen_questions:
                 # We've already seen this question in this CSV, skip it
-                logging.warning(f"Skipping duplicate question in CSV: {otazka_text}")
-
-        # 4. Link all questions to the quiz with correct ordering
-        for index, q_id in enumerate(questions_to_link):
-            association = KvizOtazky(
-                kviz_id_fk=new_quiz.kviz_id,
-                otazka_id_fk=q_id,
-                poradi=index + 1
-            )
-            db.session.add(association)
-        
+                logger.warning("Skipping duplicate question in CSV: %s", otazka_text)
+                continue
+            seen_questions.add(otazka_text)
+
+            batch.append(_row_to_question(row, otazka_text))
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                _import_question_batch(new_quiz.kviz_id, batch, linked_count + 1)
+                linked_count += len(batch)
+                batch = []
+
+        if batch:
+            _import_question_batch(new_quiz.kviz_id, batch, linked_count + 1)
+            linked_count += len(batch)
+
+        stream.detach()  # Leave closing the uploaded file to Werkzeug
+
+        # Single commit: quiz, questions and links are stored together
         db.session.commit()
-        flash(f"Quiz '{quiz_name}' successfully imported with {len(questions_to_link)} questions.", "success")
+        invalidate_quiz_list()
+        flash(f"Quiz '{quiz_name}' successfully imported with {linked_count} questions.", "success")
         
     except Exception as e:
+        # Nothing was committed yet, so the rollback also discards the new quiz
         db.session.rollback()
-        logging.error(f"Error during CSV import: {e}", exc_info=True)
+        logger.error("Error during CSV import: %s", e, exc_info=True)
         flash(f"An unexpected error occurred during import: {e}", "error")
-        # If import failed, delete the quiz entry we just created
-        if 'new_quiz' in locals() and new_quiz.kviz_id:
-            db.session.delete(new_quiz)
-            db.session.commit()
 
     return redirect(url_for('admin.kvizy_route'))
 
 @admin_bp.route('/kviz/stats/<int:kviz_id>')
 def quiz_stats(kviz_id: int):
     """Displays detailed statistics for a specific quiz."""
-    quiz = Kviz.query.get_or_404(kviz_id)
-    results = GameResult.query.filter_by(kviz_id_fk=kviz_id).all()
+    # Load the quiz's questions up front (one IN query per level) instead of
+    # lazy-loading each question while building the stats below
+    quiz = db.first_or_404(
+        select(Kviz)
+        .options(selectinload(Kviz.otazky_v_kvizu).selectinload(KvizOtazky.otazka))
+        .where(Kviz.kviz_id == kviz_id)
+    )
 
-    total_plays = len(results)
-    avg_score = 0
-    if total_plays > 0:
-        avg_score = db.session.query(sqlalchemy_func.avg(GameResult.score)).filter_by(kviz_id_fk=kviz_id).scalar()
+    # Number of plays, average score and the newest result in a single aggregate query
+    total_plays, avg_score, last_result_id, last_finished_at = db.session.execute(
+        select(
+            sqlalchemy_func.count(GameResult.id),
+            sqlalchemy_func.avg(GameResult.score),
+            sqlalchemy_func.max(GameResult.id),
+            sqlalchemy_func.max(GameResult.finished_at)
+        ).where(GameResult.kviz_id_fk == kviz_id)
+    ).one()
 
     # Aggregate per-question stats (this is complex)
+    # Keyed by question text (unique), which is what the answer logs store
     question_stats = {}
     # Initialize with all questions from the quiz
     for assoc in quiz.otazky_v_kvizu:
         q = assoc.otazka
-        question_stats[q.id] = {
+        question_stats[q.otazka] = {
             "text": q.otazka,
             "correct": q.spravna_odpoved,
             "answers": {
@@ -215,21 +316,16 @@ def quiz_stats(kviz_id: int):
         }
 
     # Aggregate data from all results
-    for result in results:
-        for log in result.answer_log:
-            # Find the question in our stats dict
-            q_text = log.get('question_text')
-            q_stat = next((qs for qs in question_stats.values() if qs['text'] == q_text), None)
-
-            if q_stat:
-                user_answer = log.get('your_answer')
-                if user_answer in q_stat['answers']:
-                    q_stat['answers'][user_answer] += 1
-                elif user_answer == "": # Handle timeout
-                    pass # Or add a 'timeout' counter
+    if total_plays > 0:
+        answer_counts = count_answers(kviz_id, (total_plays, last_result_id, last_finished_at))
+        for (q_text, user_answer), count in answer_counts.items():
+            q_stat = question_stats.get(q_text)
+            # Timeouts ("") and unknown answers are not shown
+            if q_stat and user_answer in q_stat['answers']:
+                q_stat['answers'][user_answer] += count
 
     return render_template('stats.html', 
                            quiz=quiz, 
                            total_plays=total_plays, 
-                           avg_score=avg_score,
+                           avg_score=avg_score or 0,
                            question_stats=question_stats.values())
@@ -4,11 +4,13 @@ Authentication Blueprint for KvízAréna.
 Handles Google OAuth2 authentication flow.
 """
 import os
+import hmac
 import secrets
 import logging
-from flask import Blueprint, url_for, redirect, session, request, jsonify
+from flask import Blueprint, url_for, redirect, session, request, jsonify, current_app
 from authlib.integrations.flask_client import OAuth
 from authlib.common.errors import AuthlibBaseError
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from app.database import db, User
 
@@ -19,6 +21,12 @@ auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 # This 'oauth' object will be configured from app.py
 oauth = OAuth()
 
+def _safe_equals(given, expected: str) -> bool:
+    """Compares a submitted credential with the expected one in constant time."""
+    if not isinstance(given, str):
+        return False
+    return hmac.compare_digest(given.encode(), expected.encode())
+
 @auth_bp.route('/login/google')
 def login_google():
     """Redirects to Google's login page."""
@@ -35,8 +43,9 @@ def login_google():
 @auth_bp.route('/callback/google')
 def callback_google():
     """Handles the callback from Google."""
+    google = oauth.google  # Resolve the registered client once
     try:
-        token = oauth.google.authorize_access_token()
+        token = google.authorize_access_token()
         
         # Retrieve the nonce we stored in the session
         nonce = session.get('google_auth_nonce')
@@ -44,23 +53,23 @@ def callback_google():
             raise Exception("Nonce not found in session.")
         
         # Pass the token AND the nonce for validation
-        user_info = oauth.google.parse_id_token(token, nonce=nonce)
+        user_info = google.parse_id_token(token, nonce=nonce)
         
         # Clear the used nonce from the session
         session.pop('google_auth_nonce', None)
         
     except AuthlibBaseError as e:
         # Log OAuth-specific errors with more context for debugging
-        logger.error(f"OAuth error during callback: {type(e).__name__} - {str(e)[:100]}")
+        logger.error("OAuth error during callback: %s - %.100s", type(e).__name__, e)
         return redirect('/?error=auth_failed')
-    except Exception as e:
-        # Print the actual error to the log
-        print(f"Unexpected error during OAuth callback: {type(e).__name__} - {e}")
+    except Exception:
+        # Log the actual error with its traceback
+        logger.exception("Unexpected error during OAuth callback")
         return redirect('/?error=auth_failed') # Redirect to frontend with error
 
     # Find or create user in database
     google_id = user_info.get('sub')
-    user = User.query.filter_by(google_id=google_id).first()
+    user = db.session.execute(select(User).where(User.google_id == google_id)).scalar_one_or_none()
 
     if not user:
         user = User(
@@ -104,16 +113,17 @@ def login_local():
     username = data.get('username')
     password = data.get('password')
 
-    # Get credentials from environment
-    local_user = os.getenv('LOCAL_TEST_USERNAME')
-    local_pass = os.getenv('LOCAL_TEST_PASSWORD')
+    # Get credentials loaded from the environment at startup
+    local_user = current_app.config.get('LOCAL_TEST_USERNAME')
+    local_pass = current_app.config.get('LOCAL_TEST_PASSWORD')
 
     if not local_user or not local_pass:
         return jsonify({"error": "Local test user is not configured."}), 500
 
-    if username == local_user and password == local_pass:
+    # Constant-time comparison; '&' (not 'and') so both are always evaluated
+    if _safe_equals(username, local_user) & _safe_equals(password, local_pass):
         # Find or create the test user
-        user = User.query.filter_by(username=local_user).first()
+        user = db.session.execute(select(User).where(User.username == local_user)).scalar_one_or_none()
         if not user:
             try:
                 user = User(
@@ -5,16 +5,30 @@ Handles the core gameplay logic:
 - Starting a new game session.
 - Submitting answers and getting results.
 """
+import logging
 import time
 import random
 from datetime import datetime, timezone
-from flask import Blueprint, jsonify, request, abort, session
-from app.database import db, Kviz, KvizOtazky, GameSession, Otazka, User, GameResult
-from sqlalchemy import func as sqlalchemy_func
+from flask import Blueprint, jsonify, request, abort, session, current_app
+from app.database import db, Kviz, KvizOtazky, GameSession, Otazka, User, GameResult, AnswerLogEntry
+from sqlalchemy import Boolean, and_, bindparam, case, cast, delete, func as sqlalchemy_func, select, true
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import defer, joinedload, load_only
 from app.achievements import check_and_award_achievements
 from collections import Counter
 
+logger = logging.getLogger(__name__)
+
+# Seconds the player quiz list is served from memory (admin changes clear it at once)
+QUIZ_LIST_CACHE_SECONDS = 30
+# Seconds the global leaderboard is served from memory (a finished game clears it at once)
+LEADERBOARD_CACHE_SECONDS = 60
+# Seconds a quiz's admin answer counts are served from memory (a finished game in
+# this process clears them at once; other worker processes pick them up after this)
+ANSWER_COUNTS_CACHE_SECONDS = 60
+# Maximum number of quizzes whose answer counts are kept in memory
+ANSWER_COUNTS_CACHE_SIZE = 64
+
 # Create the Blueprint
 game_api_bp = Blueprint(
     'game_api',
@@ -35,17 +49,110 @@ def _shuffle_answers(question: Otazka) -> list[dict[str, str]]:
     random.shuffle(answers)
     return answers
 
-def _get_current_question(session: GameSession) -> KvizOtazky | None:
-    """Gets the current question association based on the session index."""
-    current_poradi = session.current_question_index + 1
-    return KvizOtazky.query.filter_by(
-        kviz_id_fk=session.kviz_id_fk,
-        poradi=current_poradi
-    ).first()
-
-def _get_total_questions(kviz_id: int) -> int:
-    """Helper to get total question count for a quiz."""
-    return db.session.query(KvizOtazky).filter_by(kviz_id_fk=kviz_id).count()
+# An active game session with its quiz and its current and next question, built once
+# at import. The questions are joined by the session's own index, so one query
+# returns up to two rows. Only the columns the answer check, the log entry and the
+# next question use are loaded.
+_SESSION_WITH_QUESTIONS = select(GameSession, KvizOtazky).options(
+    joinedload(GameSession.kviz),
+    load_only(KvizOtazky.poradi),
+    joinedload(KvizOtazky.otazka).defer(Otazka.obtiznost)
+).outerjoin(KvizOtazky, and_(
+    KvizOtazky.kviz_id_fk == GameSession.kviz_id_fk,
+    KvizOtazky.poradi.in_([
+        GameSession.current_question_index + 1, GameSession.current_question_index + 2
+    ])
+)).where(GameSession.session_id == bindparam('session_id'), GameSession.is_active)
+
+def _get_session_with_questions(
+    session_id: str
+) -> tuple[GameSession | None, KvizOtazky | None, KvizOtazky | None]:
+    """
+    Gets an active game session together with its current and next question
+    association (with their questions loaded), in a single query.
+    """
+    rows = db.session.execute(_SESSION_WITH_QUESTIONS, {"session_id": session_id}).all()
+    if not rows:
+        return None, None, None
+    game_session = rows[0][0]
+    by_poradi = {assoc.poradi: assoc for _, assoc in rows if assoc is not None}
+    current_poradi = game_session.current_question_index + 1
+    return game_session, by_poradi.get(current_poradi), by_poradi.get(current_poradi + 1)
+
+def invalidate_quiz_list() -> None:
+    """Drops the cached quiz list, so the next request reads it from the database."""
+    current_app.extensions.pop('kvizarena_quiz_list', None)
+
+def invalidate_leaderboard() -> None:
+    """Drops the cached global leaderboard, so the next request recomputes it."""
+    current_app.extensions.pop('kvizarena_leaderboard', None)
+
+def invalidate_answer_counts(kviz_id: int) -> None:
+    """Drops a quiz's cached answer counts, so its admin stats page recounts them."""
+    current_app.extensions.get('kvizarena_answer_counts', {}).pop(kviz_id, None)
+
+def _question_count(kviz_id: int):
+    """Scalar subquery counting the questions of a quiz, to embed in another query."""
+    return (
+        select(sqlalchemy_func.count(KvizOtazky.id))
+        .where(KvizOtazky.kviz_id_fk == kviz_id)
+        .scalar_subquery()
+    )
+
+def answer_log_fields(*fields: str):
+    """
+    Returns a table of the entries in GameResult.answer_log plus an SQL expression for
+    each named entry field, or None if the database has no JSON functions to unpack the logs with.
+    The table reads the GameResult row it is joined to (join(entry, true())).
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        entry = sqlalchemy_func.json_array_elements(GameResult.answer_log).table_valued("value")
+        return (entry, *(entry.c.value.op("->>")(field) for field in fields))
+    if dialect == "sqlite":
+        entry = sqlalchemy_func.json_each(GameResult.answer_log).table_valued("value")
+        return (entry, *(sqlalchemy_func.json_extract(entry.c.value, f"$.{field}") for field in fields))
+    return None
+
+def count_answers(kviz_id: int, results_version: tuple) -> Counter:
+    """
+    Counts how often each (question text, answer) pair appears in a quiz's results,
+    for the admin stats page. The counts are cached per app for up to
+    ANSWER_COUNTS_CACHE_SECONDS under results_version (number of results, newest
+    result id and finish time), and dropped by invalidate_answer_counts when a game
+    finishes, so they are recomputed after a result is added or replaced.
+    """
+    cache = current_app.extensions.setdefault('kvizarena_answer_counts', {})
+    cached = cache.get(kviz_id)
+    if cached and cached[0] > time.monotonic() and cached[1] == results_version:
+        return cached[2]
+
+    counts = Counter()
+    entries = answer_log_fields('question_text', 'your_answer')
+    if entries is not None:
+        # Let the database unpack and group the answer logs; only the counts come back
+        entry, question_text, your_answer = entries
+        rows = db.session.execute(
+            select(question_text, your_answer, sqlalchemy_func.count())
+            .select_from(GameResult)
+            .join(entry, true())  # The JSON function reads the row it's joined to
+            .where(GameResult.kviz_id_fk == kviz_id)
+            .group_by(question_text, your_answer)
+        )
+        counts.update({(q_text, answer): count for q_text, answer, count in rows})
+    else:
+        # Only the answer logs are loaded, not whole GameResult objects
+        answer_logs = db.session.execute(
+            select(GameResult.answer_log).where(GameResult.kviz_id_fk == kviz_id)
+        ).scalars()
+        for answer_log in answer_logs:
+            counts.update((log.get('question_text'), log.get('your_answer')) for log in answer_log)
+
+    # Bound the cache size
+    if kviz_id not in cache and len(cache) >= ANSWER_COUNTS_CACHE_SIZE:
+        cache.clear()
+    cache[kviz_id] = (time.monotonic() + ANSWER_COUNTS_CACHE_SECONDS, results_version, counts)
+    return counts
 
 @game_api_bp.route('/user/me', methods=['GET'])
 def get_current_user():
@@ -55,7 +162,7 @@ def get_current_user():
     if not user_id:
         return jsonify({"error": "Not authenticated"}), 401
 
-    user = User.query.get(user_id)
+    user = db.session.get(User, user_id)
     if not user:
         return jsonify({"error": "User not found"}), 404
 
@@ -67,28 +174,55 @@ def get_current_user():
         "is_admin": user.is_admin
     })
 
+def _quiz_list_response(body: bytes):
+    """
+    Wraps the quiz list JSON in a conditional response. The list is the same for
+    every user, so browsers may keep it but must revalidate it by its ETag.
+    """
+    response = current_app.response_class(body, mimetype='application/json')
+    response.add_etag()
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
 @game_api_bp.route('/quizzes', methods=['GET'])
 def get_quiz_list():
     """
     Returns a list of all active quizzes available to play.
     """
+    # Quizzes change only through the admin, which invalidates this cache
+    cached = current_app.extensions.get('kvizarena_quiz_list')
+    if cached and cached[0] > time.monotonic():
+        return _quiz_list_response(cached[1])
+
     # Filter only active quizzes and order by name
     # The frontend will handle scheduled quiz availability based on start_time_utc
-    quizzes = Kviz.query.filter_by(is_active=True).order_by(Kviz.nazev).all()
+    # Question counts come from the same query (outer join so empty quizzes get 0)
+    rows = db.session.execute(
+        select(Kviz, sqlalchemy_func.count(KvizOtazky.id))
+        .outerjoin(KvizOtazky, KvizOtazky.kviz_id_fk == Kviz.kviz_id)
+        .where(Kviz.is_active)
+        .group_by(Kviz.kviz_id)
+        .order_by(Kviz.nazev)
+    ).all()
 
     quiz_list_data = []
-    for quiz in quizzes:
+    for quiz, question_count in rows:
         quiz_list_data.append({
             "id": quiz.kviz_id,
             "nazev": quiz.nazev,
             "popis": quiz.popis,
-            "pocet_otazek": _get_total_questions(quiz.kviz_id),
+            "pocet_otazek": question_count,
             "mode": quiz.quiz_mode,
             "start_time_utc": quiz.start_time.isoformat() if quiz.start_time else None,
             "allow_retakes": quiz.allow_retakes
         })
 
-    return jsonify(quiz_list_data)
+    # The serialized body is cached, so cache hits skip the JSON encoding too
+    body = jsonify(quiz_list_data).get_data()
+    current_app.extensions['kvizarena_quiz_list'] = (
+        time.monotonic() + QUIZ_LIST_CACHE_SECONDS, body
+    )
+    return _quiz_list_response(body)
 
 @game_api_bp.route('/start/<int:quiz_id>', methods=['POST'])
 def start_game(quiz_id: int):
@@ -96,13 +230,24 @@ def start_game(quiz_id: int):
     Starts a new game session for the given quiz.
     Returns a new session_id and the first question.
     """
-    quiz = Kviz.query.get_or_404(quiz_id)
+    # The quiz, its first question and the question count come from one query
+    # (outer join, so a quiz without questions is still found)
+    quiz_row = db.session.execute(
+        select(Kviz, KvizOtazky, _question_count(quiz_id))
+        .outerjoin(KvizOtazky, and_(KvizOtazky.kviz_id_fk == Kviz.kviz_id, KvizOtazky.poradi == 1))
+        .options(joinedload(KvizOtazky.otazka))
+        .where(Kviz.kviz_id == quiz_id)
+    ).first()
+    if quiz_row is None:
+        abort(404)
+    quiz, first_question_assoc, total_questions = quiz_row
+    now = time.time()  # Read the clock once for the whole request
     
     user_id = session.get('user_id')
     if not user_id:
         return jsonify({"error": "Not authenticated"}), 401
 
-    user = User.query.get(user_id)
+    user = db.session.get(User, user_id)
     if not user:
         # This can happen if user is deleted but session persists
         return jsonify({"error": "Invalid user session"}), 401
@@ -116,7 +261,7 @@ def start_game(quiz_id: int):
             return jsonify({"error": "This scheduled quiz has no start time set."}), 500
 
         # Get the current UTC time (timezone-aware)
-        now_utc = datetime.now(timezone.utc)
+        now_utc = datetime.fromtimestamp(now, timezone.utc)
 
         # Handle timezone-naive datetime from database (SQLite doesn't preserve timezone)
         quiz_start_time = quiz.start_time
@@ -136,11 +281,11 @@ def start_game(quiz_id: int):
     
     # Check for "Play Once" rule
     if not quiz.allow_retakes:
-        existing_result = GameResult.query.filter_by(
-            user_id_fk=user.id, 
-            kviz_id_fk=quiz.kviz_id
+        # Only the score is needed, not the whole result with its answer log
+        existing_result = db.session.execute(
+            select(GameResult.score).filter_by(user_id_fk=user.id, kviz_id_fk=quiz.kviz_id)
         ).first()
-        if existing_result:
+        if existing_result is not None:
             return jsonify({
                 "error": "You have already completed this quiz.",
                 "status": "completed",
@@ -148,44 +293,52 @@ def start_game(quiz_id: int):
             }), 403 # Forbidden
     
     # Check if quiz has questions
-    first_question_assoc = KvizOtazky.query.filter_by(
-        kviz_id_fk=quiz.kviz_id, 
-        poradi=1
-    ).first()
-    
-    if not first_question_assoc:
+    if first_question_assoc is None:
         return jsonify({"error": "Quiz has no questions."}), 404
 
     try:
         # Create new game session
+        # The question count is stored on the session, so answers don't recount it
         new_session = GameSession(
             kviz_id_fk=quiz.kviz_id,
             user_id_fk=user.id,
-            last_question_timestamp=int(time.time())
+            total_questions=total_questions,
+            last_question_timestamp=int(now)
         )
         db.session.add(new_session)
-        db.session.commit() # Commit to get session_id
+        db.session.flush() # Flush to get session_id
         
         question = first_question_assoc.otazka
-        total_questions = _get_total_questions(quiz.kviz_id)
         
-        return jsonify({
+        # Built before the commit, which expires the loaded objects
+        response = {
             "session_id": new_session.session_id,
             "quiz_name": quiz.nazev,
             "time_limit": quiz.time_limit_per_question,
-            "total_questions": total_questions,
+            "total_questions": new_session.total_questions,
             "question": {
                 "number": 1,
                 "text": question.otazka,
                 "answers": _shuffle_answers(question) # Send shuffled answers
             }
-        }), 201 # 201 Created
+        }
+        db.session.commit()
+
+        return jsonify(response), 201 # 201 Created
 
     except Exception as e:
         db.session.rollback()
+        logger.exception("Could not start game for quiz %s", quiz_id)
         return jsonify({"error": f"Could not start game: {e}"}), 500
 
 
+def _already_answered():
+    """
+    Response for an answer to a question that already has one logged, e.g. a
+    double-submit racing the first request (caught by uq_session_poradi).
+    """
+    return jsonify({"error": "This question has already been answered."}), 409
+
 @game_api_bp.route('/answer', methods=['POST'])
 def submit_answer():
     """
@@ -204,13 +357,14 @@ def submit_answer():
 
     if not session_id or answer_text is None:
         return jsonify({"error": "Missing session_id or answer_text"}), 400
+    if not isinstance(answer_text, str):
+        return jsonify({"error": "answer_text must be a string"}), 400
 
     # 3. Find the active session
-    game_session = GameSession.query.filter_by(
-        session_id=session_id,
-        is_active=True
-    ).first()
-    
+    # The quiz (its time limit and retake rule are needed) and the *current* and
+    # next question are loaded in the same query
+    game_session, question_assoc, next_question_assoc = _get_session_with_questions(session_id)
+
     if not game_session:
         return jsonify({"error": "Invalid or expired session"}), 404
 
@@ -218,8 +372,7 @@ def submit_answer():
     if game_session.user_id_fk != user_id:
         return jsonify({"error": "Session mismatch"}), 403 # Forbidden
 
-    # 4. Get the *current* question from the session
-    question_assoc = _get_current_question(game_session)
+    # 4. Check the *current* question was found
     if not question_assoc:
         # This should not happen, but good to check
         game_session.is_active = False
@@ -231,7 +384,9 @@ def submit_answer():
 
     # 3. Check time limit
     time_limit = quiz.time_limit_per_question
-    time_taken = int(time.time()) - game_session.last_question_timestamp
+    # The same timestamp starts the clock for the next question
+    now = int(time.time())
+    time_taken = now - game_session.last_question_timestamp
     
     is_correct = False
     
@@ -257,45 +412,60 @@ def submit_answer():
         "tema": question.tema or "General"  # Add tema (topic)
     }
 
-    # Append the log entry (must create a new list to notify SQLAlchemy)
-    new_log = list(game_session.answer_log)
-    new_log.append(log_entry)
-    game_session.answer_log = new_log
+    # Stored as a new row; the earlier answers are only read when the game ends
+    db.session.add(AnswerLogEntry(
+        session_id_fk=game_session.session_id,
+        poradi=game_session.current_question_index + 1,
+        **log_entry
+    ))
 
     # 6. Prepare for the *next* question
     game_session.current_question_index += 1
-    game_session.last_question_timestamp = int(time.time())
+    game_session.last_question_timestamp = now
 
     next_poradi = game_session.current_question_index + 1
-    next_question_assoc = KvizOtazky.query.filter_by(
-        kviz_id_fk=game_session.kviz_id_fk,
-        poradi=next_poradi
-    ).first()
-    
-    total_questions = _get_total_questions(quiz.kviz_id)
+
+    total_questions = game_session.total_questions
 
     # 6. Check if quiz is finished
     if not next_question_assoc:
         game_session.is_active = False
 
+        # Store the last answer, then read the complete log back once
+        try:
+            db.session.flush()
+        except IntegrityError:
+            db.session.rollback()
+            return _already_answered()
+        answer_log = game_session.answer_log
+
         # --- New Logic: Save GameResult and Calculate Stats ---
 
         # 6a. Check if retakes are allowed. If so, delete old result.
         if quiz.allow_retakes:
-            GameResult.query.filter_by(
-                user_id_fk=game_session.user_id_fk,
-                kviz_id_fk=game_session.kviz_id_fk
-            ).delete()
+            # No GameResult is loaded in this session, so there's nothing to synchronize
+            db.session.execute(
+                delete(GameResult).filter_by(
+                    user_id_fk=game_session.user_id_fk,
+                    kviz_id_fk=game_session.kviz_id_fk
+                ),
+                execution_options={"synchronize_session": False}
+            )
 
         # 6b. Calculate ranking statistics BEFORE adding new result
         # This ensures we compare against existing results only
-        all_scores = db.session.query(GameResult.score).filter_by(kviz_id_fk=quiz.kviz_id).all()
-        total_players = len(all_scores) + 1  # +1 for the current player
-        scores_list = [s[0] for s in all_scores]
-
-        players_worse = sum(1 for s in scores_list if s < game_session.score)
-        players_same = sum(1 for s in scores_list if s == game_session.score)
-        players_better = len(scores_list) - players_worse - players_same
+        # Counted in SQL, so only three numbers are fetched instead of every score
+        other_players, players_worse, players_same = db.session.execute(
+            select(
+                sqlalchemy_func.count(GameResult.id),
+                sqlalchemy_func.coalesce(sqlalchemy_func.sum(
+                    case((GameResult.score < game_session.score, 1), else_=0)), 0),
+                sqlalchemy_func.coalesce(sqlalchemy_func.sum(
+                    case((GameResult.score == game_session.score, 1), else_=0)), 0)
+            ).where(GameResult.kviz_id_fk == quiz.kviz_id)
+        ).one()
+        total_players = other_players + 1  # +1 for the current player
+        players_better = other_players - players_worse - players_same
 
         percentile = 0
         if total_players > 1:
@@ -318,23 +488,23 @@ def submit_answer():
                 kviz_id_fk=game_session.kviz_id_fk,
                 score=game_session.score,
                 total_questions=total_questions,
-                answer_log=game_session.answer_log,
+                answer_log=answer_log,
                 ranking_summary=ranking_summary
             )
             db.session.add(new_result)
+            db.session.flush()  # Surface constraint errors here, not at commit
         except IntegrityError:
             # This could happen if user plays twice simultaneously (race condition)
             # or if they already played a 'no-retake' quiz.
             db.session.rollback()
             return jsonify({"error": "Could not save result."}), 500
 
-        # 6d. Commit and return final JSON
-        db.session.commit()
-        
-        # Check for achievements *after* result is committed
+        # Check for achievements in a savepoint, so they are stored by the same commit
         check_and_award_achievements(game_session.user_id_fk, new_result)
-        
-        return jsonify({
+
+        # 6d. Commit and return final JSON
+        # (built first, as the commit expires the loaded objects)
+        final_response = {
             "feedback": feedback,
             "is_correct": is_correct,
             "correct_answer": question.spravna_odpoved,
@@ -344,16 +514,21 @@ def submit_answer():
             "total_questions": total_questions,
 
             # NEW: Full summary for player
-            "results_summary": game_session.answer_log,
+            "results_summary": answer_log,
             # NEW: Ranking stats
             "ranking_summary": ranking_summary
-        })
+        }
+        kviz_id = game_session.kviz_id_fk  # Read before the commit expires the session
+        db.session.commit()
+        invalidate_leaderboard()
+        invalidate_answer_counts(kviz_id)
+
+        return jsonify(final_response)
     
     # 7. Send next question
-    db.session.commit()
     next_question = next_question_assoc.otazka
     
-    return jsonify({
+    response = {
         "feedback": feedback,
         "is_correct": is_correct,
         "correct_answer": question.spravna_odpoved,
@@ -365,7 +540,14 @@ def submit_answer():
             "answers": _shuffle_answers(next_question) # Shuffle new answers
         },
         "total_questions": total_questions
-    })
+    }
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return _already_answered()
+
+    return jsonify(response)
 
 @game_api_bp.route('/user/my-stats', methods=['GET'])
 def get_my_stats():
@@ -377,28 +559,62 @@ def get_my_stats():
         return jsonify({"error": "Not authenticated"}), 401
 
     # 1. Get all game results (history)
-    results = GameResult.query.filter_by(user_id_fk=user_id).order_by(GameResult.finished_at.desc()).all()
-
-    history = []
-    topic_stats = Counter()
-    total_correct = 0
-    total_answered = 0
-
-    for res in results:
-        history.append({
+    # Eager-load the quiz of each result (used for its name) in the same query;
+    # the answer logs are aggregated separately below, so they aren't loaded here
+    results = db.session.execute(
+        select(GameResult)
+        .options(joinedload(GameResult.kviz), defer(GameResult.answer_log))
+        .filter_by(user_id_fk=user_id)
+        .order_by(GameResult.finished_at.desc())
+    ).scalars().all()
+
+    history = [
+        {
             "quiz_name": res.kviz.nazev,
             "score": res.score,
             "total_questions": res.total_questions,
             "percentile": res.ranking_summary.get("percentile", 0), # Get percentile from saved log
             "finished_at": res.finished_at.isoformat()
-        })
+        } for res in results
+    ]
+
+    # 2. Aggregate topic stats
+    topic_stats = Counter()
+    total_correct = 0
+    total_answered = 0
 
-        # 2. Aggregate topic stats
-        for log in res.answer_log:
-            if log.get("is_correct"):
-                topic_stats[log.get("tema", "General")] += 1
-                total_correct += 1
-            total_answered += 1
+    entries = answer_log_fields('tema', 'is_correct')
+    if entries is not None:
+        # Let the database unpack and group the answer logs; only per-topic counts come back
+        entry, tema, is_correct = entries
+        topic = sqlalchemy_func.coalesce(tema, "General")
+        rows = db.session.execute(
+            select(
+                topic,
+                sqlalchemy_func.sum(case((cast(is_correct, Boolean), 1), else_=0)),
+                sqlalchemy_func.count()
+            )
+            .select_from(GameResult)
+            .join(entry, true())  # The JSON function reads the row it's joined to
+            .where(GameResult.user_id_fk == user_id)
+            .group_by(topic)
+        )
+        for topic_name, correct, answered in rows:
+            if correct:
+                topic_stats[topic_name] = correct
+            total_correct += correct
+            total_answered += answered
+    else:
+        # Only the answer logs are loaded, not whole GameResult objects
+        answer_logs = db.session.execute(
+            select(GameResult.answer_log).where(GameResult.user_id_fk == user_id)
+        ).scalars()
+        for answer_log in answer_logs:
+            for log in answer_log:
+                if log.get("is_correct"):
+                    topic_stats[log.get("tema", "General")] += 1
+                    total_correct += 1
+                total_answered += 1
 
     # Format topic stats
     aggregated_stats = {
@@ -412,7 +628,11 @@ def get_my_stats():
 
     # 3. Get all earned achievements
     from app.database import UserAchievement
-    achievements = UserAchievement.query.filter_by(user_id_fk=user_id).all()
+    achievements = db.session.execute(
+        select(UserAchievement)
+        .options(joinedload(UserAchievement.achievement))
+        .filter_by(user_id_fk=user_id)
+    ).scalars().all()
     earned_achievements = [
         {
             "name": ach.achievement.name,
@@ -431,6 +651,10 @@ def get_my_stats():
 @game_api_bp.route('/leaderboard/global', methods=['GET'])
 def get_global_leaderboard():
     """Returns the top 50 users based on average percentile."""
+    # Results change only when a game finishes, which invalidates this cache
+    cached = current_app.extensions.get('kvizarena_leaderboard')
+    if cached and cached[0] > time.monotonic():
+        return current_app.response_class(cached[1], mimetype='application/json')
 
     # This is a complex query:
     # 1. Group all results by user
@@ -438,15 +662,22 @@ def get_global_leaderboard():
     # 3. Join with User table to get names
     # 4. Order by average percentile and limit to 50
 
-    leaderboard = db.session.query(
-        User.name,
-        User.profile_pic_url,
-        sqlalchemy_func.avg(GameResult.score / GameResult.total_questions * 100).label('avg_score'),
-        sqlalchemy_func.count(GameResult.id).label('quizzes_played')
-    ).join(GameResult, User.id == GameResult.user_id_fk) \
-     .group_by(User.id) \
-     .order_by(sqlalchemy_func.avg(GameResult.score / GameResult.total_questions * 100).desc()) \
-     .limit(50).all()
+    # Defined once and ordered by its label, so the average isn't spelled out twice
+    avg_score = sqlalchemy_func.avg(
+        GameResult.score / GameResult.total_questions * 100
+    ).label('avg_score')
+
+    leaderboard = db.session.execute(
+        select(
+            User.name,
+            User.profile_pic_url,
+            avg_score,
+            sqlalchemy_func.count(GameResult.id).label('quizzes_played')
+        ).join(GameResult, User.id == GameResult.user_id_fk)
+        .group_by(User.id)
+        .order_by(avg_score.desc())
+        .limit(50)
+    ).all()
 
     leaderboard_data = [
         {
@@ -457,4 +688,9 @@ def get_global_leaderboard():
         } for row in leaderboard
     ]
 
-    return jsonify(leaderboard_data)
+    # The serialized body is cached, so cache hits skip the JSON encoding too
+    body = jsonify(leaderboard_data).get_data()
+    current_app.extensions['kvizarena_leaderboard'] = (
+        time.monotonic() + LEADERBOARD_CACHE_SECONDS, body
+    )
+    return current_app.response_class(body, mimetype='application/json')
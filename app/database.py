@@ -12,7 +12,7 @@ from datetime import datetime
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy import (
-    Integer, String, Text, ForeignKey, UniqueConstraint, event, Engine, JSON, DateTime
+    Integer, String, Text, ForeignKey, UniqueConstraint, Index, event, Engine, JSON, DateTime
 )
 from sqlalchemy.sql import func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -86,6 +86,8 @@ class KvizOtazky(db.Model):
     __tablename__ = "kviz_otazky"
     __table_args__ = (
         UniqueConstraint('kviz_id_fk', 'otazka_id_fk', name='uq_kviz_otazka'),
+        # Each position in a quiz holds one question; also indexes the per-answer lookup
+        UniqueConstraint('kviz_id_fk', 'poradi', name='uq_kviz_poradi'),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -130,6 +132,10 @@ class GameResult(db.Model):
     __table_args__ = (
         # A user can only have one final result per quiz (if retakes are on, it's overwritten)
         UniqueConstraint('user_id_fk', 'kviz_id_fk', name='uq_user_kviz'),
+        # Lets the end-of-game ranking count scores from the index alone
+        Index('ix_game_results_kviz_score', 'kviz_id_fk', 'score'),
+        # Serves a user's history newest-first without a separate sort
+        Index('ix_game_results_user_finished', 'user_id_fk', 'finished_at'),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -167,19 +173,62 @@ class GameSession(db.Model):
     user_id_fk: Mapped[int] = mapped_column(ForeignKey("users.id"))
 
     score: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Number of questions in the quiz, counted once when the game starts
+    total_questions: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     current_question_index: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     last_question_timestamp: Mapped[int] = mapped_column(
         Integer, nullable=False, default=lambda: int(time.time())
     )
     is_active: Mapped[bool] = mapped_column(db.Boolean, nullable=False, default=True)
 
-    # NEW COLUMN: Log for all answers for the final summary
-    answer_log: Mapped[list] = mapped_column(JSON, nullable=False, default=list)
-
     # Relationship for easy access to quiz info
     kviz: Mapped["Kviz"] = relationship("Kviz")
     user: Mapped["User"] = relationship("User")
 
+    # Log for all answers for the final summary, one row per answer
+    answers: Mapped[list["AnswerLogEntry"]] = relationship(
+        "AnswerLogEntry", order_by="AnswerLogEntry.poradi", cascade="all, delete-orphan"
+    )
+
+    @property
+    def answer_log(self) -> list[dict]:
+        """The answers given so far, in the format stored in GameResult.answer_log."""
+        return [entry.to_dict() for entry in self.answers]
+
+class AnswerLogEntry(db.Model):
+    """
+    A single answer given in a game session.
+    Stored as its own row, so each answer is one INSERT instead of a rewrite of the whole log.
+    """
+    __tablename__ = "answer_log_entries"
+    __table_args__ = (
+        UniqueConstraint('session_id_fk', 'poradi', name='uq_session_poradi'),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    session_id_fk: Mapped[str] = mapped_column(ForeignKey("game_sessions.session_id"))
+    poradi: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    question_text: Mapped[str] = mapped_column(Text, nullable=False)
+    your_answer: Mapped[str] = mapped_column(Text, nullable=False)
+    correct_answer: Mapped[str] = mapped_column(Text, nullable=False)
+    is_correct: Mapped[bool] = mapped_column(db.Boolean, nullable=False)
+    feedback: Mapped[str] = mapped_column(String(50), nullable=False)
+    source_url: Mapped[str] = mapped_column(Text, nullable=False, default="")
+    tema: Mapped[str] = mapped_column(String(255), nullable=False)
+
+    def to_dict(self) -> dict:
+        """Returns the entry as an answer log dict."""
+        return {
+            "question_text": self.question_text,
+            "your_answer": self.your_answer,
+            "correct_answer": self.correct_answer,
+            "is_correct": self.is_correct,
+            "feedback": self.feedback,
+            "source_url": self.source_url,
+            "tema": self.tema
+        }
+
 class Achievement(db.Model):
     """Defines an achievement (e.g., 'Professor')."""
     __tablename__ = "achievements"
@@ -0,0 +1,33 @@
+"""Shared pytest fixtures."""
+
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app.database import db
+
+
+@pytest.fixture
+def capture_sql(app):
+    """
+    Returns a context manager that records the SQL statements executed on the
+    test app's engine: ``with capture_sql() as statements: ...``
+    """
+    with app.app_context():
+        engine = db.engine
+
+    @contextmanager
+    def capture():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+    return capture
@@ -0,0 +1,164 @@
+"""Tests for achievement checking and awarding."""
+
+import pytest
+from app import create_app
+from app.database import db, Kviz, User, GameResult, Achievement, UserAchievement
+from app.achievements import ALL_ACHIEVEMENTS, ALL_ACHIEVEMENT_IDS, check_and_award_achievements, init_achievements
+
+
+@pytest.fixture
+def app():
+    """Create and configure a test app instance."""
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:"
+    })
+
+    with app.app_context():
+        db.create_all()
+        init_achievements()
+        yield app
+        db.drop_all()
+
+
+def _earned(user_id):
+    """Returns the set of achievement IDs earned by the user."""
+    return {
+        ua.achievement_id_fk for ua in
+        UserAchievement.query.filter_by(user_id_fk=user_id).all()
+    }
+
+
+def _play(user, quiz_mode, score, total=5, index=0):
+    """Creates a quiz and a finished result for it."""
+    quiz = Kviz(nazev=f"Quiz {quiz_mode} {index}", quiz_mode=quiz_mode)
+    db.session.add(quiz)
+    db.session.flush()
+    result = GameResult(
+        user_id_fk=user.id,
+        kviz_id_fk=quiz.kviz_id,
+        score=score,
+        total_questions=total
+    )
+    db.session.add(result)
+    db.session.commit()
+    return result
+
+
+def test_professor_awarded_for_perfect_score(app):
+    """Test that a perfect score awards the 'professor' achievement."""
+    user = User(username="player", name="Player")
+    db.session.add(user)
+    db.session.commit()
+
+    result = _play(user, "on_demand", score=5)
+    check_and_award_achievements(user.id, result)
+    db.session.commit()
+
+    assert _earned(user.id) == {"professor"}
+
+
+def test_veteran_and_warrior_awarded_from_counts(app):
+    """Test that result counts award 'veteran' and 'warrior' achievements."""
+    user = User(username="player", name="Player")
+    db.session.add(user)
+    db.session.commit()
+
+    result = None
+    for i in range(10):
+        result = _play(user, "scheduled" if i < 3 else "on_demand", score=1, index=i)
+    check_and_award_achievements(user.id, result)
+    db.session.commit()
+
+    assert _earned(user.id) == {"veteran", "warrior"}
+
+
+def test_warrior_counts_only_scheduled_quizzes(app):
+    """Test that on-demand results don't count towards 'warrior'."""
+    user = User(username="player", name="Player")
+    db.session.add(user)
+    db.session.commit()
+
+    result = None
+    for i in range(5):
+        result = _play(user, "scheduled" if i < 2 else "on_demand", score=1, index=i)
+    check_and_award_achievements(user.id, result)
+    db.session.commit()
+
+    assert "warrior" not in _earned(user.id)
+
+
+def test_no_achievements_for_few_results(app):
+    """Test that nothing is awarded without meeting any condition."""
+    user = User(username="player", name="Player")
+    db.session.add(user)
+    db.session.commit()
+
+    result = _play(user, "scheduled", score=1)
+    check_and_award_achievements(user.id, result)
+
+    assert _earned(user.id) == set()
+
+
+def test_check_skips_queries_when_all_earned(app, capture_sql):
+    """Test that a user with every achievement triggers no aggregate query."""
+    user = User(username="player", name="Player")
+    db.session.add(user)
+    db.session.commit()
+    db.session.add_all([
+        UserAchievement(user_id_fk=user.id, achievement_id_fk=ach_id)
+        for ach_id in ALL_ACHIEVEMENT_IDS
+    ])
+    db.session.commit()
+    result = _play(user, "scheduled", score=5)
+
+    with capture_sql() as statements:
+        check_and_award_achievements(user.id, result)
+
+    assert not any("game_results" in s for s in statements)
+    assert _earned(user.id) == set(ALL_ACHIEVEMENT_IDS)
+
+
+def test_failed_check_keeps_pending_result(app):
+    """Test that an error in the check rolls back only its savepoint."""
+    user = User(username="player", name="Player")
+    db.session.add(user)
+    db.session.commit()
+
+    quiz = Kviz(nazev="Pending Quiz")
+    db.session.add(quiz)
+    db.session.flush()
+    result = GameResult(user_id_fk=user.id, kviz_id_fk=quiz.kviz_id, score=1, total_questions=1)
+    db.session.add(result)
+    db.session.flush()
+
+    # Awarding an achievement that doesn't exist violates a foreign key
+    db.session.execute(db.delete(Achievement).where(Achievement.id == "professor"))
+    check_and_award_achievements(user.id, result)
+    db.session.commit()
+
+    assert GameResult.query.count() == 1
+    assert _earned(user.id) == set()
+
+
+def test_init_achievements_is_idempotent(app):
+    """Test that seeding twice neither fails nor duplicates achievements."""
+    init_achievements()
+
+    assert Achievement.query.count() == len(ALL_ACHIEVEMENTS)
+
+
+def test_init_achievements_generic_fallback(app):
+    """Test that on other databases only the missing achievements are inserted."""
+    from types import SimpleNamespace
+    from unittest.mock import patch
+
+    db.session.delete(db.session.get(Achievement, ALL_ACHIEVEMENTS[0]["id"]))
+    db.session.commit()
+
+    other_bind = SimpleNamespace(dialect=SimpleNamespace(name="mysql"))
+    with patch.object(db.session, "get_bind", return_value=other_bind):
+        init_achievements()
+        init_achievements()
+
+    assert Achievement.query.count() == len(ALL_ACHIEVEMENTS)
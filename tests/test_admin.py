@@ -1,12 +1,13 @@
 """Tests for admin blueprint functionality."""
 
 import io
+import re
 import os
 import pytest
 from base64 import b64encode
 from unittest.mock import patch
 from app import create_app
-from app.database import db, Otazka, Kviz, KvizOtazky, User
+from app.database import db, Otazka, Kviz, KvizOtazky, User, GameResult
 
 
 @pytest.fixture
@@ -232,6 +233,27 @@ def test_import_csv_utf8_sig(admin_client, auth_headers, app):
         assert quiz is not None
 
 
+def test_import_csv_crlf_line_endings(admin_client, auth_headers, app):
+    """Test CSV import with Windows (CRLF) line endings."""
+    csv_content = "otazka,spravna_odpoved,spatna_odpoved1,spatna_odpoved2,spatna_odpoved3\r\nQ1?,A,B,C,D\r\nQ2?,A,B,C,D\r\n"
+
+    data = {
+        'quiz_name': 'CRLF Quiz',
+        'quiz_description': 'Windows line endings',
+        'time_limit': 15,
+        'csv_file': (io.BytesIO(csv_content.encode('utf-8')), 'crlf.csv')
+    }
+
+    response = admin_client.post('/admin/kviz/import', headers=auth_headers, content_type='multipart/form-data', data=data, follow_redirects=True)
+    assert response.status_code == 200
+
+    with app.app_context():
+        quiz = Kviz.query.filter_by(nazev='CRLF Quiz').first()
+        assert quiz is not None
+        assert db.session.query(KvizOtazky).filter_by(kviz_id_fk=quiz.kviz_id).count() == 2
+        assert Otazka.query.filter_by(otazka='Q2?').first().spatna_odpoved3 == 'D'
+
+
 def test_import_csv_existing_question(admin_client, auth_headers, app):
     """Test CSV import with questions that already exist in database."""
     with app.app_context():
@@ -331,10 +353,14 @@ def test_import_csv_duplicate_quiz_name(admin_client, auth_headers, app):
     
     response = admin_client.post('/admin/kviz/import', headers=auth_headers, content_type='multipart/form-data', data=data, follow_redirects=True)
     
+    assert "already exists" in response.data.decode('utf-8')
+
     with app.app_context():
         # Verify only one quiz with that name exists
         count = db.session.query(Kviz).filter_by(nazev='Existing Quiz Name').count()
         assert count == 1
+        # Verify no questions were imported for the rejected quiz
+        assert db.session.query(Otazka).count() == 0
 
 
 def test_import_csv_wrong_file_type(admin_client, auth_headers, app):
@@ -455,3 +481,515 @@ What is 3+3?,6,5,7,8"""
         assert questions[0].poradi == 1
         assert questions[1].poradi == 2
         assert questions[2].poradi == 3
+
+
+def test_import_csv_failure_leaves_no_partial_quiz(admin_client, auth_headers, app):
+    """Test that a failed import does not leave the quiz or its questions behind."""
+    from app.blueprints import admin as admin_module
+
+    # Two batches; the first is written before the second one fails
+    csv_content = "otazka,spravna_odpoved,spatna_odpoved1,spatna_odpoved2,spatna_odpoved3\n" + \
+        "".join(f"Broken question {i}?,A,B,C,D\n" for i in range(admin_module.IMPORT_BATCH_SIZE + 1))
+
+    data = {
+        'quiz_name': 'Broken Quiz',
+        'quiz_description': 'Fails halfway',
+        'time_limit': 15,
+        'csv_file': (io.BytesIO(csv_content.encode('utf-8')), 'broken.csv')
+    }
+
+    import_batch = admin_module._import_question_batch
+    calls = []
+
+    def fail_second_batch(*args):
+        calls.append(args)
+        if len(calls) > 1:
+            raise RuntimeError("Simulated database failure")
+        return import_batch(*args)
+
+    with patch.object(admin_module, '_import_question_batch', side_effect=fail_second_batch):
+        response = admin_client.post('/admin/kviz/import', headers=auth_headers, content_type='multipart/form-data', data=data, follow_redirects=True)
+    assert response.status_code == 200
+
+    with app.app_context():
+        assert Kviz.query.filter_by(nazev='Broken Quiz').first() is None
+        assert db.session.query(Otazka).count() == 0
+        assert db.session.query(KvizOtazky).count() == 0
+
+
+def test_quiz_stats_route(admin_client, auth_headers, app):
+    """Test that the quiz stats page lists the quiz's questions."""
+    with app.app_context():
+        quiz = Kviz(nazev='Stats Quiz')
+        question = Otazka(
+            otazka='Stats question?',
+            spravna_odpoved='Yes',
+            spatna_odpoved1='No',
+            spatna_odpoved2='Maybe',
+            spatna_odpoved3='Unknown'
+        )
+        db.session.add_all([quiz, question])
+        db.session.flush()
+        db.session.add(KvizOtazky(kviz_id_fk=quiz.kviz_id, otazka_id_fk=question.id, poradi=1))
+        players = [User(username=f"player{i}", name=f"Player {i}") for i in range(3)]
+        db.session.add_all(players)
+        db.session.flush()
+        for player, answer in zip(players, ['Yes', 'No', 'Yes']):
+            db.session.add(GameResult(
+                user_id_fk=player.id,
+                kviz_id_fk=quiz.kviz_id,
+                score=1 if answer == 'Yes' else 0,
+                total_questions=1,
+                answer_log=[{"question_text": 'Stats question?', "your_answer": answer}]
+            ))
+        db.session.commit()
+        quiz_id = quiz.kviz_id
+
+    response = admin_client.get(f'/admin/kviz/stats/{quiz_id}', headers=auth_headers)
+    assert response.status_code == 200
+    content = response.data.decode('utf-8')
+    assert 'Stats question?' in content
+    assert '<strong>Celkem dohrání:</strong> 3' in content
+    assert '<strong>Průměrné skóre:</strong> 0.67' in content
+    assert re.search(r'width: 66\.6+\d*%;">\s*2\s*</div>', content)
+
+    # A new result must be reflected even though the counts are cached
+    with app.app_context():
+        player = User(username="player3", name="Player 3")
+        db.session.add(player)
+        db.session.flush()
+        db.session.add(GameResult(
+            user_id_fk=player.id,
+            kviz_id_fk=quiz_id,
+            score=0,
+            total_questions=1,
+            answer_log=[{"question_text": 'Stats question?', "your_answer": 'Maybe'}]
+        ))
+        db.session.commit()
+
+    content = admin_client.get(f'/admin/kviz/stats/{quiz_id}', headers=auth_headers).data.decode('utf-8')
+    assert '<strong>Celkem dohrání:</strong> 4' in content
+    assert re.search(r'width: 25\.0%;">\s*1\s*</div>', content)
+
+    response = admin_client.get('/admin/kviz/stats/9999', headers=auth_headers)
+    assert response.status_code == 404
+
+
+def test_admin_routes_reject_non_admin(app):
+    """Test that logged-in non-admins and unknown users are redirected home."""
+    with app.app_context():
+        user = User(username="player", name="Player", is_admin=False)
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+
+    for session_user_id in (user_id, 9999):
+        with app.test_client() as client:
+            with client.session_transaction() as sess:
+                sess['user_id'] = session_user_id
+            response = client.get('/admin/kvizy')
+            assert response.status_code == 302
+            assert response.headers['Location'].endswith('/')
+
+
+def test_admin_routes_require_login(client):
+    """Test that anonymous users are sent to the login flow."""
+    response = client.get('/admin/kvizy')
+    assert response.status_code == 302
+    assert '/api/auth/login/google' in response.headers['Location']
+
+
+def test_import_csv_duplicate_rows_do_not_query_db(admin_client, auth_headers, app, capture_sql):
+    """Test that duplicate CSV rows are dropped before any question lookup."""
+    csv_content = "otazka,spravna_odpoved,spatna_odpoved1,spatna_odpoved2,spatna_odpoved3\n" + \
+        "Same question?,A,B,C,D\n" * 50
+
+    data = {
+        'quiz_name': 'Repeated Quiz',
+        'quiz_description': 'Same row many times',
+        'time_limit': 15,
+        'csv_file': (io.BytesIO(csv_content.encode('utf-8')), 'repeated.csv')
+    }
+
+    with capture_sql() as statements:
+        admin_client.post('/admin/kviz/import', headers=auth_headers, content_type='multipart/form-data', data=data)
+
+    lookups = [s for s in statements if s.lstrip().upper().startswith("SELECT") and "FROM otazky" in s]
+    assert len(lookups) == 1
+
+    with app.app_context():
+        quiz = Kviz.query.filter_by(nazev='Repeated Quiz').first()
+        assert db.session.query(KvizOtazky).filter_by(kviz_id_fk=quiz.kviz_id).count() == 1
+
+
+def test_import_csv_large_file_uses_batched_inserts(admin_client, auth_headers, app, capture_sql):
+    """Test that a large CSV is inserted with a bounded number of statements."""
+    rows = "".join(f"Question {i}?,A,B,C,D\n" for i in range(2500))
+    csv_content = "otazka,spravna_odpoved,spatna_odpoved1,spatna_odpoved2,spatna_odpoved3\n" + rows
+
+    data = {
+        'quiz_name': 'Large Quiz',
+        'quiz_description': 'Many rows',
+        'time_limit': 15,
+        'csv_file': (io.BytesIO(csv_content.encode('utf-8')), 'large.csv')
+    }
+
+    with capture_sql() as statements:
+        admin_client.post('/admin/kviz/import', headers=auth_headers, content_type='multipart/form-data', data=data)
+
+    inserts = [s for s in statements if s.lstrip().upper().startswith("INSERT")]
+    assert len(inserts) < 50
+
+    with app.app_context():
+        quiz = Kviz.query.filter_by(nazev='Large Quiz').first()
+        assert db.session.query(KvizOtazky).filter_by(kviz_id_fk=quiz.kviz_id).count() == 2500
+        last = db.session.query(KvizOtazky).filter_by(kviz_id_fk=quiz.kviz_id, poradi=2500).one()
+        assert db.session.get(Otazka, last.otazka_id_fk).otazka == 'Question 2499?'
+
+
+def test_kvizy_route_shows_question_counts(admin_client, auth_headers, app):
+    """Test that the quiz list shows per-quiz question counts, including zero."""
+    with app.app_context():
+        full_quiz = Kviz(nazev='Full Quiz')
+        empty_quiz = Kviz(nazev='Empty Quiz')
+        questions = [
+            Otazka(otazka=f'Count question {i}?', spravna_odpoved='A',
+                   spatna_odpoved1='B', spatna_odpoved2='C', spatna_odpoved3='D')
+            for i in range(3)
+        ]
+        db.session.add_all([full_quiz, empty_quiz, *questions])
+        db.session.flush()
+        db.session.add_all([
+            KvizOtazky(kviz_id_fk=full_quiz.kviz_id, otazka_id_fk=q.id, poradi=i + 1)
+            for i, q in enumerate(questions)
+        ])
+        db.session.commit()
+
+    response = admin_client.get('/admin/kvizy', headers=auth_headers)
+    assert response.status_code == 200
+
+    content = response.data.decode('utf-8')
+    assert re.search(r'<td>Empty Quiz</td>\s*<td>[^<]*</td>\s*<td>0</td>', content)
+    assert re.search(r'<td>Full Quiz</td>\s*<td>[^<]*</td>\s*<td>3</td>', content)
+
+
+def test_import_csv_commits_once(admin_client, auth_headers, app):
+    """Test that a whole CSV import is stored in a single transaction."""
+    from sqlalchemy import event
+
+    csv_content = "otazka,spravna_odpoved,spatna_odpoved1,spatna_odpoved2,spatna_odpoved3\n" + \
+        "".join(f"Commit question {i}?,A,B,C,D\n" for i in range(20))
+
+    data = {
+        'quiz_name': 'Single Commit Quiz',
+        'quiz_description': 'One transaction',
+        'time_limit': 15,
+        'csv_file': (io.BytesIO(csv_content.encode('utf-8')), 'commit.csv')
+    }
+
+    commits = []
+
+    def record(conn):
+        commits.append(conn)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "commit", record)
+    try:
+        admin_client.post('/admin/kviz/import', headers=auth_headers, content_type='multipart/form-data', data=data)
+    finally:
+        event.remove(engine, "commit", record)
+
+    assert len(commits) == 1
+
+
+def test_import_csv_flushes_only_the_quiz(admin_client, auth_headers, app):
+    """Test that the import flushes the session once, for the new quiz only."""
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+
+    csv_content = "otazka,spravna_odpoved,spatna_odpoved1,spatna_odpoved2,spatna_odpoved3\n" + \
+        "".join(f"Flush question {i}?,A,B,C,D\n" for i in range(20))
+
+    data = {
+        'quiz_name': 'Single Flush Quiz',
+        'quiz_description': 'No autoflush',
+        'time_limit': 15,
+        'csv_file': (io.BytesIO(csv_content.encode('utf-8')), 'flush.csv')
+    }
+
+    flushes = []
+
+    def record(session, flush_context, instances):
+        flushes.append(list(session.new))
+
+    event.listen(Session, "before_flush", record)
+    try:
+        admin_client.post('/admin/kviz/import', headers=auth_headers, content_type='multipart/form-data', data=data)
+    finally:
+        event.remove(Session, "before_flush", record)
+
+    non_empty = [pending for pending in flushes if pending]
+    assert len(non_empty) == 1
+    assert [type(obj) for obj in non_empty[0]] == [Kviz]
+
+
+def test_import_csv_missing_required_column(admin_client, auth_headers, app):
+    """Test that a CSV without a required column is rejected as a whole."""
+    csv_content = "otazka,spravna_odpoved,spatna_odpoved1,spatna_odpoved2\nQ?,A,B,C"
+
+    data = {
+        'quiz_name': 'Missing Column Quiz',
+        'quiz_description': 'No spatna_odpoved3',
+        'time_limit': 15,
+        'csv_file': (io.BytesIO(csv_content.encode('utf-8')), 'missing.csv')
+    }
+
+    response = admin_client.post('/admin/kviz/import', headers=auth_headers, content_type='multipart/form-data', data=data, follow_redirects=True)
+    assert response.status_code == 200
+    assert "missing required columns: spatna_odpoved3" in response.data.decode('utf-8')
+
+    with app.app_context():
+        assert Kviz.query.filter_by(nazev='Missing Column Quiz').first() is None
+
+
+def test_import_csv_short_row_is_skipped(admin_client, auth_headers, app):
+    """Test that a row with fewer fields than the header is skipped."""
+    csv_content = """otazka,spravna_odpoved,spatna_odpoved1,spatna_odpoved2,spatna_odpoved3
+Short row?,A,B
+Full row?,A,B,C,D"""
+
+    data = {
+        'quiz_name': 'Short Row Quiz',
+        'quiz_description': 'One short row',
+        'time_limit': 15,
+        'csv_file': (io.BytesIO(csv_content.encode('utf-8')), 'short.csv')
+    }
+
+    admin_client.post('/admin/kviz/import', headers=auth_headers, content_type='multipart/form-data', data=data, follow_redirects=True)
+
+    with app.app_context():
+        quiz = Kviz.query.filter_by(nazev='Short Row Quiz').first()
+        assert db.session.query(KvizOtazky).filter_by(kviz_id_fk=quiz.kviz_id).count() == 1
+
+
+def test_import_csv_rejects_oversized_upload(admin_client, auth_headers, app):
+    """Test that uploads above MAX_CONTENT_LENGTH are rejected before import."""
+    app.config["MAX_CONTENT_LENGTH"] = 1024
+    csv_content = "otazka,spravna_odpoved,spatna_odpoved1,spatna_odpoved2,spatna_odpoved3\n" + \
+        "".join(f"Big question {i}?,A,B,C,D\n" for i in range(200))
+
+    data = {
+        'quiz_name': 'Oversized Quiz',
+        'quiz_description': 'Too big',
+        'time_limit': 15,
+        'csv_file': (io.BytesIO(csv_content.encode('utf-8')), 'big.csv')
+    }
+
+    response = admin_client.post('/admin/kviz/import', headers=auth_headers, content_type='multipart/form-data', data=data)
+    assert response.status_code == 413
+
+    with app.app_context():
+        assert Kviz.query.filter_by(nazev='Oversized Quiz').first() is None
+
+
+def test_kvizy_route_paginates(admin_client, auth_headers, app):
+    """Test that the quiz list is split into pages ordered by name."""
+    from app.blueprints.admin import QUIZZES_PER_PAGE
+
+    with app.app_context():
+        db.session.add_all([Kviz(nazev=f'Quiz {i:03d}') for i in range(QUIZZES_PER_PAGE + 5)])
+        db.session.commit()
+
+    content = admin_client.get('/admin/kvizy', headers=auth_headers).data.decode('utf-8')
+    assert '<td>Quiz 000</td>' in content
+    assert f'<td>Quiz {QUIZZES_PER_PAGE - 1:03d}</td>' in content
+    assert f'<td>Quiz {QUIZZES_PER_PAGE:03d}</td>' not in content
+    assert 'Strana 1 / 2' in content
+
+    content = admin_client.get('/admin/kvizy?page=2', headers=auth_headers).data.decode('utf-8')
+    assert f'<td>Quiz {QUIZZES_PER_PAGE:03d}</td>' in content
+    assert '<td>Quiz 000</td>' not in content
+    assert 'Strana 2 / 2' in content
+
+    # A page past the end shows the last page, not an empty list
+    content = admin_client.get('/admin/kvizy?page=99', headers=auth_headers).data.decode('utf-8')
+    assert f'<td>Quiz {QUIZZES_PER_PAGE:03d}</td>' in content
+    assert 'Strana 2 / 2' in content
+
+
+def test_admin_demotion_takes_effect_immediately(admin_client, app):
+    """Test that revoking admin rights locks out an existing session right away."""
+    assert admin_client.get('/admin/kvizy').status_code == 200
+
+    with app.app_context():
+        db.session.execute(db.update(User).values(is_admin=False))
+        db.session.commit()
+
+    response = admin_client.get('/admin/kvizy')
+    assert response.status_code == 302
+    assert response.headers['Location'].endswith('/')
+
+
+def test_quiz_stats_counts_refresh_after_retake(admin_client, auth_headers, app):
+    """Test that a retake's answers replace the cached counts of the replaced result."""
+    with app.app_context():
+        quiz = Kviz(nazev='Retake Stats Quiz')
+        question = Otazka(
+            otazka='Retake question?',
+            spravna_odpoved='Yes',
+            spatna_odpoved1='No',
+            spatna_odpoved2='Maybe',
+            spatna_odpoved3='Unknown'
+        )
+        db.session.add_all([quiz, question])
+        db.session.flush()
+        db.session.add(KvizOtazky(kviz_id_fk=quiz.kviz_id, otazka_id_fk=question.id, poradi=1))
+        db.session.commit()
+        quiz_id = quiz.kviz_id
+
+    def play(answer):
+        session_id = admin_client.post(f'/api/game/start/{quiz_id}').get_json()['session_id']
+        admin_client.post('/api/game/answer', json={"session_id": session_id, "answer_text": answer})
+
+    play('No')
+    content = admin_client.get(f'/admin/kviz/stats/{quiz_id}', headers=auth_headers).data.decode('utf-8')
+    assert re.search(r'class="bar correct" style="width: 0\.0%;">\s*0\s*</div>', content)
+
+    # The retake replaces the result, which can reuse the replaced row's id
+    play('Yes')
+    content = admin_client.get(f'/admin/kviz/stats/{quiz_id}', headers=auth_headers).data.decode('utf-8')
+    assert '<strong>Celkem dohrání:</strong> 1' in content
+    assert re.search(r'class="bar correct" style="width: 100\.0%;">\s*1\s*</div>', content)
+
+
+def test_quiz_stats_counts_expire(admin_client, auth_headers, app):
+    """Test that cached answer counts expire, for results replaced by another worker."""
+    import time
+    from app.blueprints.game_api import ANSWER_COUNTS_CACHE_SECONDS
+
+    with app.app_context():
+        quiz = Kviz(nazev='Expiring Stats Quiz')
+        question = Otazka(
+            otazka='Expiring question?',
+            spravna_odpoved='Yes',
+            spatna_odpoved1='No',
+            spatna_odpoved2='Maybe',
+            spatna_odpoved3='Unknown'
+        )
+        player = User(username="player", name="Player")
+        db.session.add_all([quiz, question, player])
+        db.session.flush()
+        db.session.add(KvizOtazky(kviz_id_fk=quiz.kviz_id, otazka_id_fk=question.id, poradi=1))
+        result = GameResult(
+            user_id_fk=player.id, kviz_id_fk=quiz.kviz_id, score=0, total_questions=1,
+            answer_log=[{"question_text": 'Expiring question?', "your_answer": 'No'}]
+        )
+        db.session.add(result)
+        db.session.commit()
+        quiz_id, result_id = quiz.kviz_id, result.id
+
+    correct_bar = r'class="bar correct" style="width: {}%;">\s*{}\s*</div>'
+    content = admin_client.get(f'/admin/kviz/stats/{quiz_id}', headers=auth_headers).data.decode('utf-8')
+    assert re.search(correct_bar.format(r'0\.0', 0), content)
+
+    # A retake in another process, reusing the id and finish time, doesn't change the version
+    with app.app_context():
+        db.session.get(GameResult, result_id).answer_log = [
+            {"question_text": 'Expiring question?', "your_answer": 'Yes'}
+        ]
+        db.session.commit()
+
+    content = admin_client.get(f'/admin/kviz/stats/{quiz_id}', headers=auth_headers).data.decode('utf-8')
+    assert re.search(correct_bar.format(r'0\.0', 0), content)
+
+    later = time.monotonic() + ANSWER_COUNTS_CACHE_SECONDS + 1
+    with patch('app.blueprints.game_api.time.monotonic', return_value=later):
+        content = admin_client.get(f'/admin/kviz/stats/{quiz_id}', headers=auth_headers).data.decode('utf-8')
+    assert re.search(correct_bar.format(r'100\.0', 1), content)
+
+
+def test_count_answers_fallback_matches_sql(app):
+    """Test that the Python answer count, for databases without JSON functions, matches SQL."""
+    from app.blueprints.game_api import count_answers
+
+    quiz = Kviz(nazev='Fallback Stats Quiz')
+    players = [User(username=f"player{i}", name=f"Player {i}") for i in range(3)]
+    db.session.add_all([quiz, *players])
+    db.session.flush()
+    logs = [
+        [{"question_text": 'Q1?', "your_answer": 'A'}, {"question_text": 'Q2?', "your_answer": 'B'}],
+        [{"question_text": 'Q1?', "your_answer": 'A'}, {"question_text": 'Q2?', "your_answer": ''}],
+        [{"question_text": 'Q1?', "your_answer": 'C'}],
+    ]
+    db.session.add_all([
+        GameResult(user_id_fk=player.id, kviz_id_fk=quiz.kviz_id, score=0,
+                   total_questions=2, answer_log=log)
+        for player, log in zip(players, logs)
+    ])
+    db.session.commit()
+
+    # Different versions, so the second call isn't served from the cache
+    sql_counts = count_answers(quiz.kviz_id, ('sql',))
+    with patch('app.blueprints.game_api.answer_log_fields', return_value=None):
+        python_counts = count_answers(quiz.kviz_id, ('python',))
+
+    assert python_counts == sql_counts
+    assert sql_counts == {('Q1?', 'A'): 2, ('Q1?', 'C'): 1, ('Q2?', 'B'): 1, ('Q2?', ''): 1}
+
+
+def test_quiz_stats_aggregates_answers_in_database(admin_client, auth_headers, app, capture_sql):
+    """Test that the stats page counts answers in SQL instead of loading answer logs."""
+    with app.app_context():
+        quiz = Kviz(nazev='SQL Stats Quiz')
+        player = User(username="player", name="Player")
+        db.session.add_all([quiz, player])
+        db.session.flush()
+        db.session.add(GameResult(
+            user_id_fk=player.id,
+            kviz_id_fk=quiz.kviz_id,
+            score=0,
+            total_questions=1,
+            answer_log=[{"question_text": 'Q?', "your_answer": 'A'}]
+        ))
+        db.session.commit()
+        quiz_id = quiz.kviz_id
+
+    with capture_sql() as statements:
+        response = admin_client.get(f'/admin/kviz/stats/{quiz_id}', headers=auth_headers)
+
+    assert response.status_code == 200
+    assert any("json_each" in s for s in statements)
+    assert not any("SELECT game_results.answer_log" in s for s in statements)
+
+
+def test_safe_int_never_raises():
+    """Test that _safe_int parses signed integers and falls back on anything int() rejects."""
+    from app.blueprints.admin import _safe_int
+
+    assert _safe_int(' 4 ', 3) == 4
+    assert _safe_int('+4', 3) == 4
+    assert _safe_int('-2', 3) == -2
+    for value in (None, '', '-', '--3', '+-3', '²', '4.5', '1_000', 'hard'):
+        assert _safe_int(value, 3) == 3
+
+
+def test_import_csv_invalid_difficulty_uses_default(admin_client, auth_headers, app):
+    """Test that empty or non-numeric difficulty values fall back to the default."""
+    csv_content = """otazka,spravna_odpoved,spatna_odpoved1,spatna_odpoved2,spatna_odpoved3,obtiznost
+Easy question?,A,B,C,D,1
+Unknown question?,A,B,C,D,hard
+Blank question?,A,B,C,D,"""
+
+    data = {
+        'quiz_name': 'Difficulty Quiz',
+        'quiz_description': '',
+        'time_limit': 15,
+        'csv_file': (io.BytesIO(csv_content.encode('utf-8')), 'difficulty.csv')
+    }
+
+    admin_client.post('/admin/kviz/import', headers=auth_headers, content_type='multipart/form-data', data=data)
+
+    with app.app_context():
+        difficulties = dict(db.session.query(Otazka.otazka, Otazka.obtiznost).all())
+        assert difficulties == {'Easy question?': 1, 'Unknown question?': 3, 'Blank question?': 3}
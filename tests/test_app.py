@@ -114,6 +114,19 @@ def test_pwa_manifest_route() -> None:
     assert response.content_type == "application/json"
 
 
+def test_pwa_manifest_conditional_get() -> None:
+    """Test that /manifest.json supports conditional GET via ETag."""
+    app = create_app({"TESTING": True})
+    client = app.test_client()
+
+    response = client.get("/manifest.json")
+    etag = response.headers.get("ETag")
+    assert etag
+
+    response = client.get("/manifest.json", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+
 def test_privacy_page_route() -> None:
     """Test that /privacy route is accessible and returns HTML."""
     app = create_app({"TESTING": True})
@@ -171,7 +184,7 @@ def test_no_cache_headers_on_different_routes() -> None:
     client = app.test_client()
     
     # Test multiple routes to ensure headers are applied universally
-    routes = ["/health", "/privacy", "/terms", "/manifest.json", "/sw.js"]
+    routes = ["/health", "/privacy", "/terms", "/"]
     
     for route in routes:
         response = client.get(route)
@@ -181,3 +194,51 @@ def test_no_cache_headers_on_different_routes() -> None:
             assert 'no-cache' in response.headers['Cache-Control'], f"no-cache missing on {route}"
             assert 'Pragma' in response.headers, f"Pragma missing on {route}"
             assert 'Expires' in response.headers, f"Expires missing on {route}"
+
+
+def test_static_files_are_cacheable() -> None:
+    """Test that static and PWA files are not marked no-store."""
+    app = create_app({"TESTING": True})
+    client = app.test_client()
+
+    for route in ["/static/style.css", "/manifest.json", "/sw.js"]:
+        response = client.get(route)
+        assert response.status_code == 200, route
+        assert 'no-store' not in response.headers.get('Cache-Control', ''), route
+        assert 'Pragma' not in response.headers, route
+
+    # The service worker must always be revalidated to pick up updates
+    response = client.get("/sw.js")
+    assert 'max-age=0' in response.headers['Cache-Control']
+
+
+def test_json_provider_matches_flask_output() -> None:
+    """Test that the orjson provider, when installed, serializes like Flask's default."""
+    from datetime import datetime, timezone
+    from decimal import Decimal
+
+    from flask.json.provider import DefaultJSONProvider
+
+    app = create_app({"TESTING": True})
+    payload = {"b": [1, "Čeština"], "a": datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+               "c": Decimal("1.5"), "d": None}
+
+    default = DefaultJSONProvider(app)
+    assert app.json.loads(app.json.dumps(payload)) == default.loads(default.dumps(payload))
+    assert app.json.loads(b'{"x": [1, 2]}') == {"x": [1, 2]}
+
+    # Non-string keys and integers beyond 64 bits, which orjson rejects by default
+    for payload in ({1: "a", 2: "b"}, {"big": 2 ** 70}):
+        assert app.json.loads(app.json.dumps(payload)) == default.loads(default.dumps(payload))
+
+
+def test_engine_pool_options_for_server_database() -> None:
+    """Test that a server database gets a tuned connection pool, SQLite does not."""
+    # The PostgreSQL driver is not needed to check the configuration, so no engine is created
+    with patch.dict(os.environ, {"DB_POOL_SIZE": "5"}), patch('app.app.init_database'):
+        app = create_app({"SQLALCHEMY_DATABASE_URI": "postgresql://user@localhost/kvizarena"})
+    assert app.config["SQLALCHEMY_ENGINE_OPTIONS"]["pool_size"] == 5
+    assert app.config["SQLALCHEMY_ENGINE_OPTIONS"]["pool_pre_ping"] is True
+
+    app = create_app({"TESTING": True, "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:"})
+    assert "pool_size" not in app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {})
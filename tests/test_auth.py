@@ -4,6 +4,7 @@ import os
 from unittest.mock import patch, MagicMock
 from flask import url_for
 from app import create_app
+from app.database import db
 
 
 def test_auth_blueprint_registered() -> None:
@@ -55,3 +56,47 @@ def test_login_google_endpoint_exists() -> None:
             # This will raise BuildError if route doesn't exist
             url = url_for('auth.login_google')
             assert url == '/api/auth/login/google'
+
+
+def test_login_local() -> None:
+    """Test logging in with the local test user configured in the environment."""
+    with patch.dict(os.environ, {
+        "LOCAL_TEST_USERNAME": "tester",
+        "LOCAL_TEST_PASSWORD": "secret"
+    }):
+        app = create_app({
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "SECRET_KEY": "test-secret-key"
+        })
+
+    with app.app_context():
+        db.create_all()
+        client = app.test_client()
+
+        response = client.post('/api/auth/login/local', json={"username": "tester", "password": "wrong"})
+        assert response.status_code == 401
+
+        response = client.post('/api/auth/login/local', json={"username": "tester", "password": "secret"})
+        assert response.status_code == 200
+        assert response.get_json()["name"] == "Local Test User"
+        with client.session_transaction() as sess:
+            assert sess['user_id'] == response.get_json()["user_id"]
+        db.drop_all()
+
+
+def test_callback_google_unexpected_error_is_logged(caplog) -> None:
+    """Test that an unexpected callback error is logged and redirects with an error."""
+    app = create_app({"TESTING": True, "SECRET_KEY": "test-secret-key"})
+    client = app.test_client()
+
+    with patch('app.blueprints.auth.oauth') as mock_oauth:
+        mock_oauth.google.authorize_access_token.return_value = {"id_token": "x"}
+        # No nonce in the session -> unexpected error path
+        with caplog.at_level("ERROR", logger="app.blueprints.auth"):
+            response = client.get('/api/auth/callback/google')
+
+    assert response.status_code == 302
+    assert response.headers['Location'].endswith('/?error=auth_failed')
+    assert "Unexpected error during OAuth callback" in caplog.text
+    assert "Nonce not found in session." in caplog.text
@@ -262,3 +262,59 @@ def test_cascade_delete_quiz_questions(app):
         # Verify the association was also deleted
         remaining_assocs = db.session.query(KvizOtazky).filter_by(kviz_id_fk=quiz_id).all()
         assert len(remaining_assocs) == 0
+
+
+def _query_plan(sql):
+    """Returns SQLite's EXPLAIN QUERY PLAN details for the given SQL."""
+    rows = db.session.execute(db.text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    return " | ".join(row[-1] for row in rows)
+
+
+def test_per_user_lookups_use_indexes(app):
+    """Test that per-user result and achievement lookups are index searches."""
+    with app.app_context():
+        plan = _query_plan(
+            "SELECT count(game_results.id) FROM game_results "
+            "JOIN kvizy ON kvizy.kviz_id = game_results.kviz_id_fk "
+            "WHERE game_results.user_id_fk = 1"
+        )
+        assert "SEARCH game_results USING COVERING INDEX" in plan
+
+        plan = _query_plan(
+            "SELECT achievement_id_fk FROM user_achievements WHERE user_id_fk = 1"
+        )
+        assert "SEARCH user_achievements USING COVERING INDEX" in plan
+
+
+def test_question_text_lookup_uses_index(app):
+    """Test that the CSV import's question-text IN lookup is an index search."""
+    with app.app_context():
+        plan = _query_plan("SELECT otazka, id FROM otazky WHERE otazka IN ('a', 'b')")
+        assert "SEARCH otazky USING" in plan
+        assert "INDEX sqlite_autoindex_otazky_1 (otazka=?)" in plan
+
+
+def test_game_lookups_use_indexes(app):
+    """Test that per-answer question lookups and the finish ranking use indexes."""
+    with app.app_context():
+        plan = _query_plan(
+            "SELECT id FROM kviz_otazky WHERE kviz_id_fk = 1 AND poradi IN (1, 2)"
+        )
+        assert "INDEX sqlite_autoindex_kviz_otazky_2 (kviz_id_fk=? AND poradi=?)" in plan
+
+        plan = _query_plan(
+            "SELECT count(id), sum(CASE WHEN score < 3 THEN 1 ELSE 0 END) "
+            "FROM game_results WHERE kviz_id_fk = 1"
+        )
+        assert "SEARCH game_results USING" in plan
+        assert "ix_game_results_kviz_score (kviz_id_fk=?)" in plan
+
+
+def test_user_history_uses_index_order(app):
+    """Test that a user's newest-first history is read in index order, without a sort."""
+    with app.app_context():
+        plan = _query_plan(
+            "SELECT id FROM game_results WHERE user_id_fk = 1 ORDER BY finished_at DESC"
+        )
+        assert "ix_game_results_user_finished (user_id_fk=?)" in plan
+        assert "TEMP B-TREE" not in plan
@@ -4,7 +4,7 @@ Tests for the Game API blueprint.
 import pytest
 import time
 from app import create_app
-from app.database import db, Otazka, Kviz, KvizOtazky, GameSession, User
+from app.database import db, Otazka, Kviz, KvizOtazky, GameSession, User, GameResult
 
 @pytest.fixture
 def app():
@@ -99,6 +99,23 @@ def test_start_game_no_questions(logged_in_client, app):
     assert response.status_code == 404
     assert response.get_json()['error'] == "Quiz has no questions."
 
+def test_start_game_unknown_quiz(logged_in_client):
+    """Test that starting a quiz that doesn't exist returns 404."""
+    response = logged_in_client.post('/api/game/start/999')
+    assert response.status_code == 404
+
+def test_start_game_failure_is_logged(logged_in_client, caplog):
+    """Test that an unexpected error while starting a game is logged with its traceback."""
+    from unittest.mock import patch
+
+    with patch('app.blueprints.game_api._shuffle_answers', side_effect=RuntimeError("boom")):
+        response = logged_in_client.post('/api/game/start/1')
+
+    assert response.status_code == 500
+    record = next(r for r in caplog.records if r.name == 'app.blueprints.game_api')
+    assert record.getMessage() == "Could not start game for quiz 1"
+    assert record.exc_info is not None
+
 def test_submit_answer_correct(logged_in_client):
     """Test submitting a correct answer."""
     # 1. Start game
@@ -246,3 +263,370 @@ def test_get_quizzes_only_active(logged_in_client, app):
     assert len(json_data) == 1
     assert json_data[0]['nazev'] == "API Test Quiz"
 
+
+def test_get_my_stats_after_completion(logged_in_client):
+    """Test that a finished game shows up in the user's stats."""
+    response_start = logged_in_client.post('/api/game/start/1')
+    session_id = response_start.get_json()['session_id']
+    logged_in_client.post('/api/game/answer', json={"session_id": session_id, "answer_text": "A1"})
+    logged_in_client.post('/api/game/answer', json={"session_id": session_id, "answer_text": "Wrong"})
+
+    response = logged_in_client.get('/api/game/user/my-stats')
+    assert response.status_code == 200
+
+    json_data = response.get_json()
+    assert len(json_data['history']) == 1
+    assert json_data['history'][0]['quiz_name'] == "API Test Quiz"
+    assert json_data['history'][0]['score'] == 1
+    assert json_data['detailed_stats']['total_quizzes'] == 1
+    assert json_data['detailed_stats']['overall_accuracy'] == 50
+
+
+def test_get_my_stats_aggregates_topics_in_database(logged_in_client, app, capture_sql):
+    """Test that topic stats are counted in SQL instead of loading every answer log."""
+    with app.app_context():
+        user_id = db.session.execute(db.select(User.id).filter_by(username="testuser")).scalar_one()
+        quiz_id = db.session.execute(db.select(Kviz.kviz_id)).scalar_one()
+        db.session.add(GameResult(
+            user_id_fk=user_id,
+            kviz_id_fk=quiz_id,
+            score=3,
+            total_questions=4,
+            answer_log=[
+                {"tema": "Historie", "is_correct": True},
+                {"tema": "Historie", "is_correct": True},
+                {"tema": "Zeměpis", "is_correct": True},
+                {"tema": "Zeměpis", "is_correct": False},
+                {"tema": "Sport", "is_correct": False},
+            ]
+        ))
+        db.session.commit()
+
+    with capture_sql() as statements:
+        response = logged_in_client.get('/api/game/user/my-stats')
+
+    stats = response.get_json()['detailed_stats']
+    assert stats['overall_accuracy'] == 60
+    assert stats['by_topic'] == [
+        {"topic": "Historie", "correct_answers": 2},
+        {"topic": "Zeměpis", "correct_answers": 1},
+    ]
+    assert any("json_each" in s for s in statements)
+    assert not any("game_results.answer_log" in s and "json_each" not in s for s in statements)
+
+
+def test_get_my_stats_fallback_matches_sql(logged_in_client, app):
+    """Test that the Python topic count, for databases without JSON functions, matches SQL."""
+    from unittest.mock import patch
+
+    with app.app_context():
+        user_id = db.session.execute(db.select(User.id).filter_by(username="testuser")).scalar_one()
+        second = Kviz(nazev="Second Quiz")
+        db.session.add(second)
+        db.session.flush()
+        db.session.add_all([
+            GameResult(user_id_fk=user_id, kviz_id_fk=1, score=2, total_questions=3, answer_log=[
+                {"tema": "Historie", "is_correct": True},
+                {"tema": "Zeměpis", "is_correct": True},
+                {"tema": "Sport", "is_correct": False},
+            ]),
+            GameResult(user_id_fk=user_id, kviz_id_fk=second.kviz_id, score=1, total_questions=2, answer_log=[
+                {"tema": "Historie", "is_correct": True},
+                {"is_correct": False},
+            ]),
+        ])
+        db.session.commit()
+
+    sql_stats = logged_in_client.get('/api/game/user/my-stats').get_json()['detailed_stats']
+    with patch('app.blueprints.game_api.answer_log_fields', return_value=None):
+        python_stats = logged_in_client.get('/api/game/user/my-stats').get_json()['detailed_stats']
+
+    assert python_stats == sql_stats
+    assert sql_stats['overall_accuracy'] == 60
+    assert sql_stats['by_topic'] == [
+        {"topic": "Historie", "correct_answers": 2},
+        {"topic": "Zeměpis", "correct_answers": 1},
+    ]
+
+
+def test_get_quizzes_uses_single_query(logged_in_client, app, capture_sql):
+    """Test that question counts for the quiz list come from one query."""
+    with app.app_context():
+        db.session.add_all([Kviz(nazev=f"Extra Quiz {i}") for i in range(5)])
+        db.session.commit()
+
+    with capture_sql() as statements:
+        response = logged_in_client.get('/api/game/quizzes')
+
+    counts = {quiz['nazev']: quiz['pocet_otazek'] for quiz in response.get_json()}
+    assert counts["API Test Quiz"] == 2
+    assert counts["Extra Quiz 0"] == 0
+    assert len([s for s in statements if "kviz_otazky" in s]) == 1
+
+
+def test_submit_answer_does_not_recount_questions(logged_in_client, app, capture_sql):
+    """Test that answers use the question count stored when the game started."""
+    response_start = logged_in_client.post('/api/game/start/1')
+    session_id = response_start.get_json()['session_id']
+
+    with app.app_context():
+        assert db.session.get(GameSession, session_id).total_questions == 2
+
+    with capture_sql() as statements:
+        response = logged_in_client.post('/api/game/answer', json={"session_id": session_id, "answer_text": "A1"})
+
+    assert response.get_json()['total_questions'] == 2
+    assert not any("count(" in s.lower() for s in statements)
+
+
+def test_submit_answer_loads_questions_in_one_query(logged_in_client, capture_sql):
+    """Test that an answer loads the session, quiz and both questions in one query."""
+    response_start = logged_in_client.post('/api/game/start/1')
+    session_id = response_start.get_json()['session_id']
+
+    with capture_sql() as statements:
+        response = logged_in_client.post('/api/game/answer', json={"session_id": session_id, "answer_text": "A1"})
+
+    assert response.get_json()['next_question']['text'] == "Q2"
+    selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+    assert len(selects) == 1
+    assert "obtiznost" not in selects[0]
+
+
+def test_submit_answer_updates_session_in_one_statement(logged_in_client, capture_sql):
+    """Test that an answer writes the session with a single UPDATE of the changed columns."""
+    response_start = logged_in_client.post('/api/game/start/1')
+    session_id = response_start.get_json()['session_id']
+
+    with capture_sql() as statements:
+        logged_in_client.post('/api/game/answer', json={"session_id": session_id, "answer_text": "A1"})
+
+    updates = [s for s in statements if s.lstrip().upper().startswith("UPDATE")]
+    assert len(updates) == 1
+    assert updates[0].lstrip().startswith("UPDATE game_sessions")
+    assert "kviz_id_fk" not in updates[0]
+
+
+def test_submit_answer_double_submit_conflict(logged_in_client, app):
+    """Test that a racing second answer to the same question gets 409, not a 500."""
+    from app.database import AnswerLogEntry
+
+    def answer_logged_by_racing_request(session_id, poradi):
+        with app.app_context():
+            db.session.add(AnswerLogEntry(
+                session_id_fk=session_id, poradi=poradi, question_text=f"Q{poradi}",
+                your_answer="A", correct_answer="A", is_correct=True, feedback="Correct!", tema="General"
+            ))
+            db.session.commit()
+
+    session_id = logged_in_client.post('/api/game/start/1').get_json()['session_id']
+
+    # Racing on a question with a next one fails at the commit
+    answer_logged_by_racing_request(session_id, 1)
+    response = logged_in_client.post('/api/game/answer', json={"session_id": session_id, "answer_text": "A1"})
+    assert response.status_code == 409
+    assert response.get_json()['error'] == "This question has already been answered."
+
+    # Racing on the last question fails at the flush before the result is saved
+    with app.app_context():
+        db.session.get(GameSession, session_id).current_question_index = 1
+        db.session.commit()
+    answer_logged_by_racing_request(session_id, 2)
+    response = logged_in_client.post('/api/game/answer', json={"session_id": session_id, "answer_text": "A2"})
+    assert response.status_code == 409
+
+    with app.app_context():
+        assert db.session.execute(db.select(GameResult)).first() is None
+
+
+def test_submit_answer_rejects_non_string_answer(logged_in_client):
+    """Test that an answer that isn't a string is rejected before it is logged."""
+    session_id = logged_in_client.post('/api/game/start/1').get_json()['session_id']
+
+    for answer in (["A1"], {"text": "A1"}, 1):
+        response = logged_in_client.post('/api/game/answer', json={"session_id": session_id, "answer_text": answer})
+        assert response.status_code == 400
+        assert response.get_json()['error'] == "answer_text must be a string"
+
+    response = logged_in_client.post('/api/game/answer', json={"session_id": session_id, "answer_text": "A1"})
+    assert response.get_json()['is_correct'] is True
+
+
+def test_game_completion_ranking_summary(logged_in_client, app):
+    """Test that the final ranking compares the score with other players' results."""
+    with app.app_context():
+        others = [User(username=f"other{i}", name=f"Other {i}") for i in range(3)]
+        db.session.add_all(others)
+        db.session.flush()
+        db.session.add_all([
+            GameResult(user_id_fk=user.id, kviz_id_fk=1, score=score, total_questions=2)
+            for user, score in zip(others, [0, 1, 2])
+        ])
+        db.session.commit()
+
+    response_start = logged_in_client.post('/api/game/start/1')
+    session_id = response_start.get_json()['session_id']
+    logged_in_client.post('/api/game/answer', json={"session_id": session_id, "answer_text": "A1"})
+    response = logged_in_client.post('/api/game/answer', json={"session_id": session_id, "answer_text": "Wrong"})
+
+    assert response.get_json()['ranking_summary'] == {
+        "total_players": 4,
+        "players_worse": 1,
+        "players_same": 1,
+        "players_better": 1,
+        "percentile": 33.33
+    }
+
+
+def test_start_game_query_count(logged_in_client, capture_sql):
+    """Test that starting a game doesn't reload objects after committing."""
+    with capture_sql() as statements:
+        response = logged_in_client.post('/api/game/start/1')
+
+    assert response.status_code == 201
+    assert response.get_json()['question']['text'] == "Q1"
+    # The user, then the quiz with its first question, that question's Otazka and the question count
+    selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+    assert len(selects) == 2
+
+
+def test_submit_answer_inserts_one_log_row(logged_in_client, app, capture_sql):
+    """Test that each answer is stored as one new row without loading the earlier ones."""
+    response_start = logged_in_client.post('/api/game/start/1')
+    session_id = response_start.get_json()['session_id']
+
+    with capture_sql() as statements:
+        logged_in_client.post('/api/game/answer', json={"session_id": session_id, "answer_text": "Čtyři"})
+
+    log_statements = [s for s in statements if "answer_log_entries" in s]
+    assert len(log_statements) == 1
+    assert log_statements[0].lstrip().upper().startswith("INSERT")
+
+    with app.app_context():
+        log = db.session.get(GameSession, session_id).answer_log
+        assert [entry['your_answer'] for entry in log] == ["Čtyři"]
+
+    response = logged_in_client.post('/api/game/answer', json={"session_id": session_id, "answer_text": "A2"})
+    summary = response.get_json()['results_summary']
+    assert [entry['question_text'] for entry in summary] == ["Q1", "Q2"]
+    assert [entry['is_correct'] for entry in summary] == [False, True]
+
+
+def test_get_quizzes_is_cached_until_admin_change(logged_in_client, app):
+    """Test that the quiz list is cached and refreshed after an admin import."""
+    import io
+
+    logged_in_client.get('/api/game/quizzes')
+
+    with app.app_context():
+        db.session.add(Kviz(nazev="Direct Insert Quiz"))
+        admin = User(username="admin", name="Admin", is_admin=True)
+        db.session.add(admin)
+        db.session.commit()
+        admin_id = admin.id
+
+    # Served from the cache, so a quiz added behind the app's back isn't listed yet
+    names = [quiz['nazev'] for quiz in logged_in_client.get('/api/game/quizzes').get_json()]
+    assert names == ["API Test Quiz"]
+
+    csv_content = "otazka,spravna_odpoved,spatna_odpoved1,spatna_odpoved2,spatna_odpoved3\nNew?,A,B,C,D\n"
+    with app.test_client() as admin_client:
+        with admin_client.session_transaction() as sess:
+            sess['user_id'] = admin_id
+        admin_client.post('/admin/kviz/import', content_type='multipart/form-data', data={
+            'quiz_name': 'Imported Quiz',
+            'time_limit': 15,
+            'is_active': 'on',
+            'csv_file': (io.BytesIO(csv_content.encode('utf-8')), 'new.csv')
+        })
+
+    names = [quiz['nazev'] for quiz in logged_in_client.get('/api/game/quizzes').get_json()]
+    assert names == ["API Test Quiz", "Direct Insert Quiz", "Imported Quiz"]
+
+
+def test_start_game_play_once_quiz_already_completed(logged_in_client, app, capture_sql):
+    """Test that a no-retake quiz can't be restarted, even with a zero score."""
+    with app.app_context():
+        quiz = db.session.get(Kviz, 1)
+        quiz.allow_retakes = False
+        user_id = db.session.execute(db.select(User.id).filter_by(username="testuser")).scalar()
+        db.session.add(GameResult(user_id_fk=user_id, kviz_id_fk=1, score=0, total_questions=2))
+        db.session.commit()
+
+    with capture_sql() as statements:
+        response = logged_in_client.post('/api/game/start/1')
+
+    assert response.status_code == 403
+    assert response.get_json()['status'] == "completed"
+    assert response.get_json()['final_score'] == 0
+    assert not any("answer_log" in s for s in statements)
+
+
+def test_global_leaderboard(logged_in_client, app):
+    """Test that the leaderboard averages score percentages and orders by them."""
+    with app.app_context():
+        second = Kviz(nazev="Second Quiz")
+        good = User(username="good", name="Good Player")
+        weak = User(username="weak", name="Weak Player")
+        db.session.add_all([second, good, weak])
+        db.session.flush()
+        db.session.add_all([
+            GameResult(user_id_fk=good.id, kviz_id_fk=1, score=2, total_questions=2),
+            GameResult(user_id_fk=good.id, kviz_id_fk=second.kviz_id, score=1, total_questions=2),
+            GameResult(user_id_fk=weak.id, kviz_id_fk=1, score=1, total_questions=4),
+        ])
+        db.session.commit()
+
+    response = logged_in_client.get('/api/game/leaderboard/global')
+    assert response.status_code == 200
+    assert [(row['name'], row['avg_score'], row['quizzes_played']) for row in response.get_json()] == [
+        ("Good Player", 75.0, 2),
+        ("Weak Player", 25.0, 1),
+    ]
+
+
+def test_global_leaderboard_is_cached_until_game_finishes(logged_in_client, app):
+    """Test that the leaderboard is cached and refreshed once a game is finished."""
+    assert logged_in_client.get('/api/game/leaderboard/global').get_json() == []
+
+    with app.app_context():
+        other = User(username="other", name="Other Player")
+        db.session.add(other)
+        db.session.flush()
+        db.session.add(GameResult(user_id_fk=other.id, kviz_id_fk=1, score=1, total_questions=2))
+        db.session.commit()
+
+    # Served from the cache, so a result added behind the app's back isn't ranked yet
+    assert logged_in_client.get('/api/game/leaderboard/global').get_json() == []
+
+    session_id = logged_in_client.post('/api/game/start/1').get_json()['session_id']
+    logged_in_client.post('/api/game/answer', json={"session_id": session_id, "answer_text": "A1"})
+    logged_in_client.post('/api/game/answer', json={"session_id": session_id, "answer_text": "A2"})
+
+    names = [row['name'] for row in logged_in_client.get('/api/game/leaderboard/global').get_json()]
+    assert names == ["Test User", "Other Player"]
+
+
+def test_get_quizzes_conditional_get(logged_in_client):
+    """Test that the quiz list carries an ETag and answers 304 when unchanged."""
+    response = logged_in_client.get('/api/game/quizzes')
+    etag = response.headers['ETag']
+    assert 'no-store' not in response.headers['Cache-Control']
+    assert 'no-cache' in response.headers['Cache-Control']
+
+    response = logged_in_client.get('/api/game/quizzes', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
+
+def test_retake_replaces_previous_result(logged_in_client, app):
+    """Test that replaying a quiz with retakes overwrites the previous result."""
+    for answers in (["Wrong", "Wrong"], ["A1", "A2"]):
+        session_id = logged_in_client.post('/api/game/start/1').get_json()['session_id']
+        for answer in answers:
+            response = logged_in_client.post('/api/game/answer', json={"session_id": session_id, "answer_text": answer})
+        assert response.get_json()['quiz_finished'] is True
+
+    with app.app_context():
+        results = db.session.execute(db.select(GameResult.score)).scalars().all()
+        assert results == [2]